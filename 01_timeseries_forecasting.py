@@ -16,6 +16,7 @@ simulate automated alert systems for agricultural decision-making.
 
 import pandas as pd
 import numpy as np
+import pyarrow.dataset as ds
 import matplotlib.pyplot as plt
 import seaborn as sns
 from datetime import datetime, timedelta
@@ -25,7 +26,6 @@ warnings.filterwarnings('ignore')
 # Time series libraries
 from statsmodels.tsa.stattools import adfuller, acf, pacf
 from statsmodels.tsa.arima.model import ARIMA
-from statsmodels.graphics.tsaplots import plot_acf, plot_pacf
 from prophet import Prophet
 
 # Evaluation metrics
@@ -52,19 +52,23 @@ print("="*80)
 print("\n[1.1] Loading MAWN Quality-Controlled Hourly Data")
 print("-" * 80)
 
-# Load the extracted hourly data
-df_hourly = pd.read_csv('mawn_hourly_sample.csv', parse_dates=['datetime'])
+# The extracted hourly data is partitioned by station (station=<name>/),
+# so filtering on the study station only reads that station's files.
+# Arrow-backed dtypes keep the quality-flag strings compact
+station = 'aetna'
+hourly_dataset = ds.dataset('mawn_hourly_sample', format='parquet',
+                            partitioning=ds.HivePartitioning.discover(infer_dictionary=True))
+stations = hourly_dataset.partitioning.dictionaries[0].to_pylist()
+
+df_station = hourly_dataset.to_table(filter=ds.field('station') == station).to_pandas(types_mapper=pd.ArrowDtype)
 
-print(f" Loaded {len(df_hourly):,} hourly records")
-print(f" Date range: {df_hourly['datetime'].min()} to {df_hourly['datetime'].max()}")
-print(f" Stations: {', '.join(df_hourly['station'].unique())}")
+print(f" Stations available: {', '.join(stations)}")
+print(f" Loaded {len(df_station):,} hourly records for {station}")
 
 print("\n[1.2] Data Quality Assessment")
 print("-" * 80)
 
-# Filter to single station for time-series analysis
-station = 'aetna'
-df_station = df_hourly[df_hourly['station'] == station].copy()
+# Single station for time-series analysis
 df_station = df_station.sort_values('datetime').reset_index(drop=True)
 
 print(f"Selected station: {station.upper()}")
@@ -87,30 +91,39 @@ print("-" * 80)
 print("Rationale: Daily aggregation reduces noise and is appropriate for")
 print("agricultural decision-making timescales (planting, pest management).")
 
-# Aggregate to daily data
-df_station['date'] = df_station['datetime'].dt.date
-
-daily_agg = df_station.groupby('date').agg({
-    'atmp': ['min', 'max', 'mean'],
-    'relh': ['min', 'max', 'mean'],
-    'dwpt': ['min', 'max', 'mean'],
-    'pcpn': 'sum',  # Total daily precipitation
-    'lws0_pwet': 'sum',  # Hours of leaf wetness
-    'wspd': 'mean',
-    'srad': 'sum',  # Total daily solar radiation
-    'rpet': 'sum'  # Total daily evapotranspiration
-}).reset_index()
-
-# Flatten column names
-daily_agg.columns = ['_'.join(col).strip('_') for col in daily_agg.columns.values]
-daily_agg.rename(columns={'date': 'date'}, inplace=True)
-daily_agg['date'] = pd.to_datetime(daily_agg['date'])
+# Aggregate to daily data (floor to midnight so the group key stays a timestamp)
+df_station['date'] = df_station['datetime'].dt.floor('D')
+
+daily_agg = df_station.groupby('date').agg(
+    atmp_min=('atmp', 'min'),
+    atmp_max=('atmp', 'max'),
+    atmp_mean=('atmp', 'mean'),
+    relh_min=('relh', 'min'),
+    relh_max=('relh', 'max'),
+    relh_mean=('relh', 'mean'),
+    dwpt_min=('dwpt', 'min'),
+    dwpt_max=('dwpt', 'max'),
+    dwpt_mean=('dwpt', 'mean'),
+    pcpn_sum=('pcpn', 'sum'),  # Total daily precipitation
+    lws0_pwet_sum=('lws0_pwet', 'sum'),  # Hours of leaf wetness
+    wspd_mean=('wspd', 'mean'),
+    srad_sum=('srad', 'sum'),  # Total daily solar radiation
+    rpet_sum=('rpet', 'sum')  # Total daily evapotranspiration
+).reset_index()
+
+# Back to NumPy dtypes for feature engineering, statsmodels and matplotlib.
+# float32 is ample for sensor readings (degC, %, mm) and halves the footprint.
+# The rounding is ~1e-7 relative, but the refitted models amplify it: ARIMA
+# validation MAE moves by ~0.02degC and Prophet forecasts by up to ~0.002degC
+value_cols = daily_agg.columns.drop('date')
+daily_agg[value_cols] = daily_agg[value_cols].astype(np.float32)
+daily_agg['date'] = daily_agg['date'].astype('datetime64[ns]')
 
 print(f" Daily records created: {len(daily_agg):,}")
 print(f" Date range: {daily_agg['date'].min()} to {daily_agg['date'].max()}")
 
 # Calculate Growing Degree Days (GDD) - Base 10degC
-daily_agg['gdd'] = daily_agg['atmp_mean'].apply(lambda x: max(0, x - 10))
+daily_agg['gdd'] = np.maximum(daily_agg['atmp_mean'].to_numpy() - 10.0, 0.0)
 
 # Calculate temperature range
 daily_agg['temp_range'] = daily_agg['atmp_max'] - daily_agg['atmp_min']
@@ -125,15 +138,16 @@ print("\n[1.4] Handling Missing Values")
 print("-" * 80)
 
 # Check for missing values in daily data
-missing_daily = daily_agg.isnull().sum()
+missing_daily = daily_agg.isna().sum()
 print("Missing values in daily data:")
 print(missing_daily[missing_daily > 0])
 
-# Forward fill small gaps (up to 3 days)
-daily_agg = daily_agg.fillna(method='ffill', limit=3)
+# Forward fill small gaps (up to 3 days), touching only columns that have gaps
+nan_cols = missing_daily.index[missing_daily > 0]
+daily_agg[nan_cols] = daily_agg[nan_cols].ffill(limit=3)
 
 # Check remaining missing values
-missing_after = daily_agg.isnull().sum()
+missing_after = daily_agg[nan_cols].isna().sum()
 print("\nMissing values after forward fill:")
 print(missing_after[missing_after > 0])
 
@@ -162,9 +176,9 @@ print(f"\n Train set: {len(train_data):,} days ({train_data['date'].min()} to {t
 print(f" Validation set: {len(val_data):,} days ({val_data['date'].min()} to {val_data['date'].max()})")
 print(f" Test set: {len(test_data):,} days ({test_data['date'].min()} to {test_data['date'].max()})")
 
-# Save processed data
-daily_agg.to_csv('daily_weather_aetna.csv', index=False)
-print(f"\n Saved processed daily data to: daily_weather_aetna.csv")
+# Save processed data (Parquet keeps the float32/datetime dtypes, no re-parsing)
+daily_agg.to_parquet('daily_weather_aetna.parquet', engine='pyarrow', compression='zstd', index=False)
+print(f"\n Saved processed daily data to: daily_weather_aetna.parquet")
 
 # ============================================================================
 # SECTION 2: EXPLORATORY DATA ANALYSIS
@@ -216,12 +230,12 @@ axes[2].legend()
 axes[2].grid(True, alpha=0.3)
 
 plt.tight_layout()
-plt.savefig('figures/01_weather_timeseries_overview.png', dpi=300, bbox_inches='tight')
+plt.savefig('figures/01_weather_timeseries_overview.png', dpi=150, bbox_inches='tight')
 print(" Saved: figures/01_weather_timeseries_overview.png")
 plt.close()
 
 # Plot 2: Seasonal patterns
-fig, axes = plt.subplots(2, 2, figsize=(14, 10))
+fig, axes = plt.subplots(2, 2, figsize=(14, 10), constrained_layout=True)
 
 # Monthly temperature patterns
 train_data['month'] = train_data['date'].dt.month
@@ -255,15 +269,14 @@ axes[1, 0].set_title('Temperature Distribution', fontweight='bold')
 axes[1, 0].grid(True, alpha=0.3)
 
 # Growing Degree Days accumulation
-train_data['gdd_cumsum'] = train_data['gdd'].cumsum()
-axes[1, 1].plot(train_data['date'], train_data['gdd_cumsum'], linewidth=2)
+gdd_cumsum = np.cumsum(train_data['gdd'].to_numpy())
+axes[1, 1].plot(train_data['date'], gdd_cumsum, linewidth=2)
 axes[1, 1].set_xlabel('Date')
 axes[1, 1].set_ylabel('Cumulative GDD')
 axes[1, 1].set_title('Growing Degree Days Accumulation', fontweight='bold')
 axes[1, 1].grid(True, alpha=0.3)
 
-plt.tight_layout()
-plt.savefig('figures/02_seasonal_patterns.png', dpi=300, bbox_inches='tight')
+plt.savefig('figures/02_seasonal_patterns.png', dpi=150)
 print(" Saved: figures/02_seasonal_patterns.png")
 plt.close()
 
@@ -285,8 +298,8 @@ def test_stationarity(timeseries, variable_name):
     print(f"\n[{variable_name}]")
     print("-" * 80)
     
-    # Perform ADF test
-    result = adfuller(timeseries.dropna(), autolag='AIC')
+    # Perform ADF test (statsmodels only needs the raw values)
+    result = adfuller(timeseries.dropna().to_numpy(), autolag='AIC')
     
     print(f"ADF Statistic: {result[0]:.6f}")
     print(f"p-value: {result[1]:.6f}")
@@ -307,10 +320,10 @@ def test_stationarity(timeseries, variable_name):
 temp_series = train_data.set_index('date')['atmp_mean']
 is_stationary, d_temp = test_stationarity(temp_series, "Mean Temperature")
 
-# Test differenced temperature if needed
+# Test differenced temperature if needed (the differenced series is reused in Section 4)
+temp_diff = temp_series.diff().dropna()
 if not is_stationary:
     print("\n  Testing first-order differencing...")
-    temp_diff = temp_series.diff().dropna()
     is_stationary_diff, _ = test_stationarity(temp_diff, "Differenced Temperature")
 
 # ============================================================================
@@ -325,26 +338,40 @@ print("  - p: AR order (from PACF)")
 print("  - d: Differencing order (from stationarity test)")
 print("  - q: MA order (from ACF)")
 
+def plot_correlation(ax, values, n_obs, title):
+    """
+    Stem plot of precomputed ACF/PACF values with a 95% confidence band
+    """
+    lags = np.arange(len(values))
+    conf = 1.96 / np.sqrt(n_obs)
+    ax.vlines(lags, 0, values, color='steelblue')
+    ax.plot(lags, values, 'o', color='steelblue', markersize=4)
+    ax.axhline(y=0, color='black', linewidth=0.8)
+    ax.fill_between(lags, -conf, conf, alpha=0.25, color='steelblue')
+    ax.set_title(title, fontweight='bold')
+
+# Compute each correlation function once (FFT-based ACF), then plot the arrays
+n_lags = 40
+temp_values = temp_series.dropna().to_numpy()
+diff_values = temp_diff.to_numpy()
+acf_orig = acf(temp_values, nlags=n_lags, fft=True)
+pacf_orig = pacf(temp_values, nlags=n_lags, method='ywm')
+acf_diff = acf(diff_values, nlags=n_lags, fft=True)
+pacf_diff = pacf(diff_values, nlags=n_lags, method='ywm')
+
 # Create ACF/PACF plots
 fig, axes = plt.subplots(2, 2, figsize=(14, 8))
 
 # Original series
-plot_acf(temp_series.dropna(), lags=40, ax=axes[0, 0])
-axes[0, 0].set_title('ACF: Original Temperature Series', fontweight='bold')
-
-plot_pacf(temp_series.dropna(), lags=40, ax=axes[0, 1])
-axes[0, 1].set_title('PACF: Original Temperature Series', fontweight='bold')
+plot_correlation(axes[0, 0], acf_orig, len(temp_values), 'ACF: Original Temperature Series')
+plot_correlation(axes[0, 1], pacf_orig, len(temp_values), 'PACF: Original Temperature Series')
 
 # Differenced series
-temp_diff = temp_series.diff().dropna()
-plot_acf(temp_diff, lags=40, ax=axes[1, 0])
-axes[1, 0].set_title('ACF: Differenced Temperature Series', fontweight='bold')
-
-plot_pacf(temp_diff, lags=40, ax=axes[1, 1])
-axes[1, 1].set_title('PACF: Differenced Temperature Series', fontweight='bold')
+plot_correlation(axes[1, 0], acf_diff, len(diff_values), 'ACF: Differenced Temperature Series')
+plot_correlation(axes[1, 1], pacf_diff, len(diff_values), 'PACF: Differenced Temperature Series')
 
 plt.tight_layout()
-plt.savefig('figures/03_acf_pacf_analysis.png', dpi=300, bbox_inches='tight')
+plt.savefig('figures/03_acf_pacf_analysis.png', dpi=150, bbox_inches='tight')
 print("\n Saved: figures/03_acf_pacf_analysis.png")
 plt.close()
 
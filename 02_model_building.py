@@ -21,7 +21,9 @@ warnings.filterwarnings('ignore')
 # Time series libraries
 from statsmodels.tsa.arima.model import ARIMA
 from prophet import Prophet
+import gc
 import itertools
+from joblib import Memory, Parallel, delayed
 
 # Evaluation metrics
 from sklearn.metrics import mean_absolute_error, mean_squared_error, mean_absolute_percentage_error
@@ -37,7 +39,7 @@ print("PROJECT 1: MODEL BUILDING & EVALUATION")
 print("="*80)
 
 # Load processed data
-daily_data = pd.read_csv('daily_weather_aetna.csv', parse_dates=['date'])
+daily_data = pd.read_parquet('daily_weather_aetna.parquet')
 
 # Create splits
 train_end = '2023-12-31'
@@ -59,39 +61,70 @@ print("\n[5.1] ARIMA Parameter Selection via Grid Search")
 print("-" * 80)
 print("Strategy: Test multiple (p,d,q) combinations and select based on AIC")
 
-# Prepare time series
-temp_train = train_data.set_index('date')['atmp_mean']
-temp_val = val_data.set_index('date')['atmp_mean']
-temp_test = test_data.set_index('date')['atmp_mean']
+# Prepare time series as plain ndarrays, extracted once; fits, metrics
+# and residuals all work on these
+y_train = train_data['atmp_mean'].to_numpy(dtype=np.float32)
+y_val = val_data['atmp_mean'].to_numpy(dtype=np.float32)
+y_test = test_data['atmp_mean'].to_numpy(dtype=np.float32)
 
 # Grid search for ARIMA parameters
 p_values = [0, 1, 2, 3, 5]
 d_values = [1]  # From stationarity test
 q_values = [0, 1, 2, 3, 5]
 
+# Fitted models are cached on disk (keyed by order and series contents), so
+# reruns skip the MLE fits entirely unless the data or grid changes
+memory = Memory('.arima_cache', verbose=0)
+
+@memory.cache
+def fit_arima_cached(y, order):
+    """
+    Fit a single ARIMA candidate (a failed fit raises, and joblib only caches results)
+    """
+    warnings.filterwarnings('ignore')
+    return ARIMA(y, order=order).fit()
+
+def fit_arima(y, order):
+    """
+    Fit a single ARIMA candidate (returns None if the fit fails)
+    """
+    # Failures stay out of the cache so a later run (or statsmodels) can retry them
+    try:
+        return fit_arima_cached(y, order)
+    except Exception:
+        return None
+
 best_aic = np.inf
 best_params = None
+best_fit = None
 results_grid = []
 
 print("\nTesting parameter combinations...")
-print("(This may take a few minutes...)")
+print("(Fits are distributed across all CPU cores)")
+
+# Fit every candidate in parallel; y_train is a plain ndarray so workers
+# don't have to unpickle a DatetimeIndex for each fit. Each candidate runs
+# to full convergence from the default start_params: seeding from a
+# neighbouring order or ranking truncated (maxiter=15) fits both change the
+# selected model, since the larger orders need the late iterations
+param_grid = list(itertools.product(p_values, d_values, q_values))
+grid_fits = Parallel(n_jobs=-1, backend='loky')(
+    delayed(fit_arima)(y_train, order) for order in param_grid
+)
 
-for p, d, q in itertools.product(p_values, d_values, q_values):
-    try:
-        model = ARIMA(temp_train, order=(p, d, q))
-        fitted_model = model.fit()
-        aic = fitted_model.aic
-        results_grid.append({'p': p, 'd': d, 'q': q, 'AIC': aic})
-        
-        if aic < best_aic:
-            best_aic = aic
-            best_params = (p, d, q)
-        
-        if (p + q) % 3 == 0:  # Print progress every few iterations
-            print(f"  Tested ARIMA({p},{d},{q}): AIC = {aic:.2f}")
-            
-    except Exception as e:
+for (p, d, q), fitted_model in zip(param_grid, grid_fits):
+    if fitted_model is None:
         continue
+    aic = fitted_model.aic
+    results_grid.append({'p': p, 'd': d, 'q': q, 'AIC': aic})
+    
+    if aic < best_aic:
+        best_aic = aic
+        best_params = (p, d, q)
+        best_fit = fitted_model
+    
+    if (p + q) % 3 == 0:  # Print progress every few iterations
+        print(f"  Tested ARIMA({p},{d},{q}): AIC = {aic:.2f}")
 
 print(f"\n Grid search completed")
 print(f" Best parameters: ARIMA{best_params}")
@@ -105,9 +138,10 @@ print(results_df.to_string(index=False))
 print("\n[5.2] Training Final ARIMA Model")
 print("-" * 80)
 
-# Train final model with best parameters
-arima_model = ARIMA(temp_train, order=best_params)
-arima_fitted = arima_model.fit()
+# The grid search already fitted the best order on the training data,
+# so reuse that fit instead of running the same MLE a second time
+arima_fitted = best_fit
+del grid_fits
 
 print(f" ARIMA{best_params} model trained")
 print(f"\nModel Summary:")
@@ -121,9 +155,9 @@ n_val = len(val_data)
 arima_forecast_val = arima_fitted.forecast(steps=n_val)
 
 # Calculate metrics
-mae_val = mean_absolute_error(temp_val, arima_forecast_val)
-rmse_val = np.sqrt(mean_squared_error(temp_val, arima_forecast_val))
-mape_val = mean_absolute_percentage_error(temp_val, arima_forecast_val) * 100
+mae_val = mean_absolute_error(y_val, arima_forecast_val)
+rmse_val = np.sqrt(mean_squared_error(y_val, arima_forecast_val))
+mape_val = mean_absolute_percentage_error(y_val, arima_forecast_val) * 100
 
 print(f" Validation Set Performance:")
 print(f"  - MAE:  {mae_val:.3f}degC")
@@ -134,24 +168,27 @@ print("\n[5.4] ARIMA Forecasting - Test Set")
 print("-" * 80)
 
 # Retrain on train+val for test set prediction
-temp_train_full = pd.concat([temp_train, temp_val])
-arima_model_full = ARIMA(temp_train_full, order=best_params)
-arima_fitted_full = arima_model_full.fit()
+y_train_full = np.concatenate((y_train, y_val))
+arima_fitted_full = fit_arima(y_train_full, best_params)
 
 # Forecast on test set
 n_test = len(test_data)
 arima_forecast_test = arima_fitted_full.forecast(steps=n_test)
 
 # Calculate metrics
-mae_test = mean_absolute_error(temp_test, arima_forecast_test)
-rmse_test = np.sqrt(mean_squared_error(temp_test, arima_forecast_test))
-mape_test = mean_absolute_percentage_error(temp_test, arima_forecast_test) * 100
+mae_test = mean_absolute_error(y_test, arima_forecast_test)
+rmse_test = np.sqrt(mean_squared_error(y_test, arima_forecast_test))
+mape_test = mean_absolute_percentage_error(y_test, arima_forecast_test) * 100
 
 print(f" Test Set Performance:")
 print(f"  - MAE:  {mae_test:.3f}degC")
 print(f"  - RMSE: {rmse_test:.3f}degC")
 print(f"  - MAPE: {mape_test:.2f}%")
 
+# Only the forecasts are needed from here on; release the fitted models
+del arima_fitted, arima_fitted_full, best_fit, results_grid, results_df
+gc.collect()
+
 # ============================================================================
 # SECTION 6: PROPHET MODEL DEVELOPMENT
 # ============================================================================
@@ -178,6 +215,7 @@ print("  - Yearly seasonality: Auto")
 print("  - Weekly seasonality: Auto")
 print("  - Daily seasonality: False (using daily data)")
 print("  - Changepoint prior scale: 0.05 (default)")
+print("  - Uncertainty samples: 0 (point forecasts only)")
 
 # Initialize and train Prophet model
 prophet_model = Prophet(
@@ -185,7 +223,7 @@ prophet_model = Prophet(
     weekly_seasonality=True,
     daily_seasonality=False,
     changepoint_prior_scale=0.05,
-    interval_width=0.95
+    uncertainty_samples=0  # Only yhat is evaluated, skip interval simulation
 )
 
 prophet_model.fit(prophet_train)
@@ -194,17 +232,17 @@ print(" Prophet model trained")
 print("\n[6.3] Prophet Forecasting - Validation Set")
 print("-" * 80)
 
-# Create future dataframe for validation
-future_val = prophet_model.make_future_dataframe(periods=n_val, freq='D')
-prophet_forecast_val = prophet_model.predict(future_val)
-
-# Extract validation predictions
-prophet_pred_val = prophet_forecast_val.iloc[-n_val:]['yhat'].values
+# Predict only the validation dates (make_future_dataframe would also
+# re-score every training day)
+future_val = pd.DataFrame({
+    'ds': pd.date_range(prophet_train['ds'].iloc[-1] + pd.Timedelta('1D'), periods=n_val, freq='D')
+})
+prophet_pred_val = prophet_model.predict(future_val)['yhat'].to_numpy()
 
 # Calculate metrics
-mae_prophet_val = mean_absolute_error(temp_val, prophet_pred_val)
-rmse_prophet_val = np.sqrt(mean_squared_error(temp_val, prophet_pred_val))
-mape_prophet_val = mean_absolute_percentage_error(temp_val, prophet_pred_val) * 100
+mae_prophet_val = mean_absolute_error(y_val, prophet_pred_val)
+rmse_prophet_val = np.sqrt(mean_squared_error(y_val, prophet_pred_val))
+mape_prophet_val = mean_absolute_percentage_error(y_val, prophet_pred_val) * 100
 
 print(f" Validation Set Performance:")
 print(f"  - MAE:  {mae_prophet_val:.3f}degC")
@@ -214,34 +252,49 @@ print(f"  - MAPE: {mape_prophet_val:.2f}%")
 print("\n[6.4] Prophet Forecasting - Test Set")
 print("-" * 80)
 
-# Retrain on train+val
+def stan_init(m):
+    """
+    Extract the MAP parameters of a fitted Prophet model as Stan init values
+    """
+    return {
+        'k': m.params['k'][0][0],
+        'm': m.params['m'][0][0],
+        'delta': m.params['delta'][0],
+        'beta': m.params['beta'][0],
+        'sigma_obs': m.params['sigma_obs'][0][0]
+    }
+
+# Retrain on train+val, warm-starting the optimiser from the train fit
 prophet_train_full = pd.concat([prophet_train, prophet_val])
 prophet_model_full = Prophet(
     yearly_seasonality=True,
     weekly_seasonality=True,
     daily_seasonality=False,
     changepoint_prior_scale=0.05,
-    interval_width=0.95
+    uncertainty_samples=0
 )
-prophet_model_full.fit(prophet_train_full)
-
-# Forecast test set
-future_test = prophet_model_full.make_future_dataframe(periods=n_test, freq='D')
-prophet_forecast_test = prophet_model_full.predict(future_test)
+prophet_model_full.fit(prophet_train_full, init=stan_init(prophet_model))
 
-# Extract test predictions
-prophet_pred_test = prophet_forecast_test.iloc[-n_test:]['yhat'].values
+# Forecast test dates only
+future_test = pd.DataFrame({
+    'ds': pd.date_range(prophet_train_full['ds'].iloc[-1] + pd.Timedelta('1D'), periods=n_test, freq='D')
+})
+prophet_pred_test = prophet_model_full.predict(future_test)['yhat'].to_numpy()
 
 # Calculate metrics
-mae_prophet_test = mean_absolute_error(temp_test, prophet_pred_test)
-rmse_prophet_test = np.sqrt(mean_squared_error(temp_test, prophet_pred_test))
-mape_prophet_test = mean_absolute_percentage_error(temp_test, prophet_pred_test) * 100
+mae_prophet_test = mean_absolute_error(y_test, prophet_pred_test)
+rmse_prophet_test = np.sqrt(mean_squared_error(y_test, prophet_pred_test))
+mape_prophet_test = mean_absolute_percentage_error(y_test, prophet_pred_test) * 100
 
 print(f" Test Set Performance:")
 print(f"  - MAE:  {mae_prophet_test:.3f}degC")
 print(f"  - RMSE: {rmse_prophet_test:.3f}degC")
 print(f"  - MAPE: {mape_prophet_test:.2f}%")
 
+# Keep only the yhat arrays; release the models and forecast frames
+del prophet_model, prophet_model_full, future_val, future_test
+gc.collect()
+
 # ============================================================================
 # SECTION 7: BASELINE MODEL (PERSISTENCE)
 # ============================================================================
@@ -252,12 +305,12 @@ print("="*80)
 print("Persistence model: Tomorrow's temperature = Today's temperature")
 
 # Validation set baseline
-baseline_pred_val = temp_train.iloc[-1:].values[0]  # Last training value
-baseline_pred_val = np.full(n_val, baseline_pred_val)
+# Each day is forecast with the previous day's observed value
+baseline_pred_val = np.concatenate(([y_train[-1]], y_val[:-1]))
 
-mae_baseline_val = mean_absolute_error(temp_val, baseline_pred_val)
-rmse_baseline_val = np.sqrt(mean_squared_error(temp_val, baseline_pred_val))
-mape_baseline_val = mean_absolute_percentage_error(temp_val, baseline_pred_val) * 100
+mae_baseline_val = mean_absolute_error(y_val, baseline_pred_val)
+rmse_baseline_val = np.sqrt(mean_squared_error(y_val, baseline_pred_val))
+mape_baseline_val = mean_absolute_percentage_error(y_val, baseline_pred_val) * 100
 
 print(f"\n Validation Set Performance:")
 print(f"  - MAE:  {mae_baseline_val:.3f}degC")
@@ -265,12 +318,11 @@ print(f"  - RMSE: {rmse_baseline_val:.3f}degC")
 print(f"  - MAPE: {mape_baseline_val:.2f}%")
 
 # Test set baseline
-baseline_pred_test = temp_train_full.iloc[-1:].values[0]
-baseline_pred_test = np.full(n_test, baseline_pred_test)
+baseline_pred_test = np.concatenate(([y_train_full[-1]], y_test[:-1]))
 
-mae_baseline_test = mean_absolute_error(temp_test, baseline_pred_test)
-rmse_baseline_test = np.sqrt(mean_squared_error(temp_test, baseline_pred_test))
-mape_baseline_test = mean_absolute_percentage_error(temp_test, baseline_pred_test) * 100
+mae_baseline_test = mean_absolute_error(y_test, baseline_pred_test)
+rmse_baseline_test = np.sqrt(mean_squared_error(y_test, baseline_pred_test))
+mape_baseline_test = mean_absolute_percentage_error(y_test, baseline_pred_test) * 100
 
 print(f"\n Test Set Performance:")
 print(f"  - MAE:  {mae_baseline_test:.3f}degC")
@@ -317,10 +369,10 @@ print("SECTION 9: FORECAST VISUALIZATIONS")
 print("="*80)
 
 # Plot 1: Test set forecasts comparison
-fig, axes = plt.subplots(2, 1, figsize=(14, 10))
+fig, axes = plt.subplots(2, 1, figsize=(14, 10), constrained_layout=True)
 
 # Full view
-axes[0].plot(test_data['date'], temp_test.values, label='Actual', linewidth=2, color='black')
+axes[0].plot(test_data['date'], y_test, label='Actual', linewidth=2, color='black')
 axes[0].plot(test_data['date'], arima_forecast_test, label=f'ARIMA{best_params}', linewidth=2, alpha=0.8)
 axes[0].plot(test_data['date'], prophet_pred_test, label='Prophet', linewidth=2, alpha=0.8)
 axes[0].plot(test_data['date'], baseline_pred_test, label='Baseline', linewidth=2, alpha=0.6, linestyle='--')
@@ -331,7 +383,7 @@ axes[0].grid(True, alpha=0.3)
 
 # Zoomed view - first 30 days
 zoom_days = 30
-axes[1].plot(test_data['date'][:zoom_days], temp_test.values[:zoom_days], 
+axes[1].plot(test_data['date'][:zoom_days], y_test[:zoom_days], 
              label='Actual', linewidth=2, color='black', marker='o')
 axes[1].plot(test_data['date'][:zoom_days], arima_forecast_test[:zoom_days], 
              label=f'ARIMA{best_params}', linewidth=2, alpha=0.8, marker='s')
@@ -343,8 +395,7 @@ axes[1].set_title(f'Zoomed View - First {zoom_days} Days', fontsize=12, fontweig
 axes[1].legend(loc='best')
 axes[1].grid(True, alpha=0.3)
 
-plt.tight_layout()
-plt.savefig('figures/04_forecast_comparison.png', dpi=300, bbox_inches='tight')
+plt.savefig('figures/04_forecast_comparison.png', dpi=150)
 print(" Saved: figures/04_forecast_comparison.png")
 plt.close()
 
@@ -352,7 +403,7 @@ plt.close()
 fig, axes = plt.subplots(2, 2, figsize=(14, 10))
 
 # ARIMA residuals
-arima_residuals = temp_test.values - arima_forecast_test
+arima_residuals = y_test - arima_forecast_test
 axes[0, 0].plot(test_data['date'], arima_residuals, marker='o', linestyle='-', alpha=0.7)
 axes[0, 0].axhline(y=0, color='r', linestyle='--')
 axes[0, 0].set_ylabel('Residual (degC)')
@@ -367,7 +418,7 @@ axes[0, 1].set_title(f'ARIMA{best_params} Residual Distribution', fontweight='bo
 axes[0, 1].grid(True, alpha=0.3)
 
 # Prophet residuals
-prophet_residuals = temp_test.values - prophet_pred_test
+prophet_residuals = y_test - prophet_pred_test
 axes[1, 0].plot(test_data['date'], prophet_residuals, marker='o', linestyle='-', alpha=0.7, color='orange')
 axes[1, 0].axhline(y=0, color='r', linestyle='--')
 axes[1, 0].set_ylabel('Residual (degC)')
@@ -383,7 +434,7 @@ axes[1, 1].set_title('Prophet Residual Distribution', fontweight='bold')
 axes[1, 1].grid(True, alpha=0.3)
 
 plt.tight_layout()
-plt.savefig('figures/05_residual_analysis.png', dpi=300, bbox_inches='tight')
+plt.savefig('figures/05_residual_analysis.png', dpi=150, bbox_inches='tight')
 print(" Saved: figures/05_residual_analysis.png")
 plt.close()
 
@@ -406,7 +457,7 @@ ax.legend()
 ax.grid(True, alpha=0.3, axis='y')
 
 plt.tight_layout()
-plt.savefig('figures/06_model_performance_comparison.png', dpi=300, bbox_inches='tight')
+plt.savefig('figures/06_model_performance_comparison.png', dpi=150, bbox_inches='tight')
 print(" Saved: figures/06_model_performance_comparison.png")
 plt.close()
 
@@ -14,6 +14,9 @@ Prophet forecasts to warn farmers about critical weather events.
 
 import pandas as pd
 import numpy as np
+import os
+import matplotlib
+matplotlib.use('Agg')  # Figures are only saved to disk, never shown
 import matplotlib.pyplot as plt
 import seaborn as sns
 from datetime import datetime, timedelta
@@ -21,6 +24,7 @@ import warnings
 warnings.filterwarnings('ignore')
 
 from prophet import Prophet
+from joblib import Memory, Parallel, delayed
 
 # Set plotting style
 plt.style.use('seaborn-v0_8-darkgrid')
@@ -43,57 +47,67 @@ print("Extending forecasts to include humidity and precipitation for")
 print("comprehensive pest and disease risk assessment.")
 
 # Load processed data
-daily_data = pd.read_csv('daily_weather_aetna.csv', parse_dates=['date'])
+daily_data = pd.read_parquet('daily_weather_aetna.parquet')
 
-# Create splits
-train_end = '2023-12-31'
+# Create splits (the final models train on train+val, which ends at val_end)
 val_end = '2024-12-31'
 
-train_data = daily_data[daily_data['date'] <= train_end].copy()
-val_data = daily_data[(daily_data['date'] > train_end) & (daily_data['date'] <= val_end)].copy()
+# Select train+val in a single pass, keeping only the forecast variables
+train_full = daily_data.loc[daily_data['date'] <= val_end, ['date', 'atmp_mean', 'relh_mean', 'pcpn_sum']]
 test_data = daily_data[daily_data['date'] > val_end].copy()
 
-# Combine train and val for final models
-train_full = pd.concat([train_data, val_data])
+# Forecasts are cached on disk (keyed by training data and settings), so
+# reruns skip the Prophet fits unless the data changes
+memory = Memory('.prophet_cache', verbose=0)
 
-print("\n[10.1] Temperature Forecasting (Prophet)")
-print("-" * 80)
+@memory.cache
+def forecast_prophet(df, periods, weekly_seasonality, uncertainty_samples):
+    """
+    Fit a Prophet model and forecast the training period plus `periods` days
+    """
+    model = Prophet(yearly_seasonality=True, weekly_seasonality=weekly_seasonality,
+                    daily_seasonality=False, uncertainty_samples=uncertainty_samples)
+    model.fit(df)
+    future = model.make_future_dataframe(periods=periods, freq='D')
+    return model.predict(future)
 
-# Temperature model
+# Forecast 14 days ahead (beyond test set for demonstration)
+forecast_periods = len(test_data) + 14
+
+# The three models are independent, so fit them concurrently
 temp_df = train_full[['date', 'atmp_mean']].rename(columns={'date': 'ds', 'atmp_mean': 'y'})
-temp_model = Prophet(yearly_seasonality=True, weekly_seasonality=True, daily_seasonality=False)
-temp_model.fit(temp_df)
+humid_df = train_full[['date', 'relh_mean']].rename(columns={'date': 'ds', 'relh_mean': 'y'})
+precip_df = train_full[['date', 'pcpn_sum']].rename(columns={'date': 'ds', 'pcpn_sum': 'y'})
 
-# Forecast 14 days ahead (beyond test set for demonstration)
-future_temp = temp_model.make_future_dataframe(periods=len(test_data) + 14, freq='D')
-forecast_temp = temp_model.predict(future_temp)
+# Precipitation has no weekly cycle (and is more challenging due to sparsity).
+# Only the temperature interval is plotted, so the other two skip the Monte
+# Carlo uncertainty simulation and a small sample suffices for temperature
+prophet_jobs = [(temp_df, True, 100), (humid_df, True, 0), (precip_df, False, 0)]
+
+# Only spin up workers for forecasts that are not already cached
+pending = [job for job in prophet_jobs
+           if not forecast_prophet.check_call_in_cache(job[0], forecast_periods, *job[1:])]
+if pending:
+    Parallel(n_jobs=len(pending), backend='loky')(
+        delayed(forecast_prophet)(df, forecast_periods, weekly_seasonality, uncertainty_samples)
+        for df, weekly_seasonality, uncertainty_samples in pending
+    )
+
+forecast_temp, forecast_humid, forecast_precip = [
+    forecast_prophet(df, forecast_periods, weekly_seasonality, uncertainty_samples)
+    for df, weekly_seasonality, uncertainty_samples in prophet_jobs
+]
 
+print("\n[10.1] Temperature Forecasting (Prophet)")
+print("-" * 80)
 print(f" Temperature forecast: {len(forecast_temp)} days")
 
 print("\n[10.2] Relative Humidity Forecasting (Prophet)")
 print("-" * 80)
-
-# Humidity model
-humid_df = train_full[['date', 'relh_mean']].rename(columns={'date': 'ds', 'relh_mean': 'y'})
-humid_model = Prophet(yearly_seasonality=True, weekly_seasonality=True, daily_seasonality=False)
-humid_model.fit(humid_df)
-
-future_humid = humid_model.make_future_dataframe(periods=len(test_data) + 14, freq='D')
-forecast_humid = humid_model.predict(future_humid)
-
 print(f" Humidity forecast: {len(forecast_humid)} days")
 
 print("\n[10.3] Precipitation Forecasting (Prophet)")
 print("-" * 80)
-
-# Precipitation model (more challenging due to sparsity)
-precip_df = train_full[['date', 'pcpn_sum']].rename(columns={'date': 'ds', 'pcpn_sum': 'y'})
-precip_model = Prophet(yearly_seasonality=True, weekly_seasonality=False, daily_seasonality=False)
-precip_model.fit(precip_df)
-
-future_precip = precip_model.make_future_dataframe(periods=len(test_data) + 14, freq='D')
-forecast_precip = precip_model.predict(future_precip)
-
 print(f" Precipitation forecast: {len(forecast_precip)} days")
 
 # ============================================================================
@@ -160,95 +174,118 @@ print("\n" + "="*80)
 print("SECTION 12: ALERT GENERATION ENGINE")
 print("="*80)
 
-def generate_alerts(forecast_df, alert_thresholds):
+def generate_alerts(forecast_df, alert_thresholds, text_df=None):
     """
     Generate alerts based on forecast data and thresholds
+    Message text is formatted from text_df (the same rows at full precision) when given
     """
-    alerts = []
+    # An empty forecast has no first day to count lead times from
+    if forecast_df.empty:
+        return pd.DataFrame({
+            'date': forecast_df['ds'].to_numpy(),
+            'type': pd.Categorical([]),
+            'severity': pd.Categorical([]),
+            'message': pd.Series([], dtype=object),
+            'value': forecast_df['temp'].to_numpy(),
+            'lead_time_days': np.empty(0, dtype=np.int32)
+        })
     
-    for idx, row in forecast_df.iterrows():
-        date = row['ds']
-        temp = row['temp']
-        humid = row['humid']
-        precip = row['precip']
-        
-        # Frost warning
-        if temp < alert_thresholds['frost_warning']['threshold_temp']:
-            alerts.append({
-                'date': date,
-                'type': 'frost_warning',
-                'severity': 'HIGH',
-                'message': f"FROST WARNING: Temperature forecast {temp:.1f}degC (below 0degC)",
-                'value': temp,
-                'lead_time_days': (date - forecast_df.iloc[0]['ds']).days
-            })
-        
-        # Heat stress
-        if temp > alert_thresholds['heat_stress']['threshold_temp']:
-            alerts.append({
-                'date': date,
-                'type': 'heat_stress',
-                'severity': 'MEDIUM',
-                'message': f"HEAT STRESS: Temperature forecast {temp:.1f}degC (above 30degC)",
-                'value': temp,
-                'lead_time_days': (date - forecast_df.iloc[0]['ds']).days
-            })
-        
-        # High disease risk
-        if (humid > alert_thresholds['disease_risk_high']['threshold_humid'] and
-            alert_thresholds['disease_risk_high']['temp_range'][0] <= temp <= 
-            alert_thresholds['disease_risk_high']['temp_range'][1]):
-            alerts.append({
-                'date': date,
-                'type': 'disease_risk_high',
-                'severity': 'HIGH',
-                'message': f"HIGH DISEASE RISK: Humidity {humid:.1f}%, Temp {temp:.1f}degC",
-                'value': humid,
-                'lead_time_days': (date - forecast_df.iloc[0]['ds']).days
-            })
-        
-        # Moderate disease risk
-        elif (humid > alert_thresholds['disease_risk_moderate']['threshold_humid'] and
-              alert_thresholds['disease_risk_moderate']['temp_range'][0] <= temp <= 
-              alert_thresholds['disease_risk_moderate']['temp_range'][1]):
-            alerts.append({
-                'date': date,
-                'type': 'disease_risk_moderate',
-                'severity': 'MEDIUM',
-                'message': f"MODERATE DISEASE RISK: Humidity {humid:.1f}%, Temp {temp:.1f}degC",
-                'value': humid,
-                'lead_time_days': (date - forecast_df.iloc[0]['ds']).days
-            })
-        
-        # Heavy rain
-        if precip > alert_thresholds['heavy_rain']['threshold_precip']:
-            alerts.append({
-                'date': date,
-                'type': 'heavy_rain',
-                'severity': 'HIGH',
-                'message': f"HEAVY RAIN: Precipitation forecast {precip:.1f}mm (above 25mm)",
-                'value': precip,
-                'lead_time_days': (date - forecast_df.iloc[0]['ds']).days
-            })
+    dates = forecast_df['ds'].to_numpy()
+    temp = forecast_df['temp'].to_numpy()
+    humid = forecast_df['humid'].to_numpy()
+    precip = forecast_df['precip'].to_numpy()
+    
+    if text_df is None:
+        text_df = forecast_df
+    temp_text = text_df['temp'].to_numpy()
+    humid_text = text_df['humid'].to_numpy()
+    precip_text = text_df['precip'].to_numpy()
+    
+    # Days from the start of the forecast, computed once for every row
+    lead_days = ((dates - dates[0]) // np.timedelta64(1, 'D')).astype(np.int32)
+    
+    # Evaluate every threshold over the whole forecast at once
+    high_range = alert_thresholds['disease_risk_high']['temp_range']
+    mod_range = alert_thresholds['disease_risk_moderate']['temp_range']
+    frost_mask = temp < alert_thresholds['frost_warning']['threshold_temp']
+    heat_mask = temp > alert_thresholds['heat_stress']['threshold_temp']
+    high_mask = ((humid > alert_thresholds['disease_risk_high']['threshold_humid']) &
+                 (temp >= high_range[0]) & (temp <= high_range[1]))
+    mod_mask = (~high_mask &
+                (humid > alert_thresholds['disease_risk_moderate']['threshold_humid']) &
+                (temp >= mod_range[0]) & (temp <= mod_range[1]))
+    rain_mask = precip > alert_thresholds['heavy_rain']['threshold_precip']
     
-    return pd.DataFrame(alerts)
+    # Every per-type frame shares these dtypes, so the concat stays categorical
+    type_dtype = pd.CategoricalDtype(list(alert_thresholds))
+    severity_dtype = pd.CategoricalDtype(['HIGH', 'MEDIUM'])
+    
+    def constant_column(value, n, dtype):
+        return pd.Categorical.from_codes(np.full(n, dtype.categories.get_loc(value)), dtype=dtype)
+    
+    def alert_frame(mask, alert_type, severity, values, messages):
+        n = np.count_nonzero(mask)
+        return pd.DataFrame({
+            'date': dates[mask],
+            'type': constant_column(alert_type, n, type_dtype),
+            'severity': constant_column(severity, n, severity_dtype),
+            'message': messages,
+            'value': values[mask],
+            'lead_time_days': lead_days[mask]
+        })
+    
+    frames = [
+        alert_frame(frost_mask, 'frost_warning', 'HIGH', temp,
+                    [f"FROST WARNING: Temperature forecast {t:.1f}degC (below 0degC)"
+                     for t in temp_text[frost_mask]]),
+        alert_frame(heat_mask, 'heat_stress', 'MEDIUM', temp,
+                    [f"HEAT STRESS: Temperature forecast {t:.1f}degC (above 30degC)"
+                     for t in temp_text[heat_mask]]),
+        alert_frame(high_mask, 'disease_risk_high', 'HIGH', humid,
+                    [f"HIGH DISEASE RISK: Humidity {h:.1f}%, Temp {t:.1f}degC"
+                     for h, t in zip(humid_text[high_mask], temp_text[high_mask])]),
+        alert_frame(mod_mask, 'disease_risk_moderate', 'MEDIUM', humid,
+                    [f"MODERATE DISEASE RISK: Humidity {h:.1f}%, Temp {t:.1f}degC"
+                     for h, t in zip(humid_text[mod_mask], temp_text[mod_mask])]),
+        alert_frame(rain_mask, 'heavy_rain', 'HIGH', precip,
+                    [f"HEAVY RAIN: Precipitation forecast {p:.1f}mm (above 25mm)"
+                     for p in precip_text[rain_mask]])
+    ]
+    
+    # Stable sort restores the per-day order the alerts were checked in
+    alerts = pd.concat(frames, ignore_index=True)
+    alerts = alerts.sort_values('date', kind='stable', ignore_index=True)
+    
+    # Report only the types and severities that actually fired
+    alerts['type'] = alerts['type'].cat.remove_unused_categories()
+    alerts['severity'] = alerts['severity'].cat.remove_unused_categories()
+    return alerts
 
 print("\n[12.1] Preparing Forecast Data")
 print("-" * 80)
 
-# Combine forecasts into single dataframe
+# Combine forecasts into single dataframe, in float32 like the daily data
 forecast_combined = pd.DataFrame({
     'ds': forecast_temp['ds'],
-    'temp': forecast_temp['yhat'],
-    'temp_lower': forecast_temp['yhat_lower'],
-    'temp_upper': forecast_temp['yhat_upper'],
-    'humid': forecast_humid['yhat'],
-    'precip': forecast_precip['yhat'].clip(lower=0)  # Precipitation can't be negative
+    'temp': forecast_temp['yhat'].astype(np.float32),
+    'temp_lower': forecast_temp['yhat_lower'].astype(np.float32),
+    'temp_upper': forecast_temp['yhat_upper'].astype(np.float32),
+    'humid': forecast_humid['yhat'].astype(np.float32),
+    'precip': forecast_precip['yhat'].clip(lower=0).astype(np.float32)  # Precipitation can't be negative
 })
 
 # Focus on test period for alert generation
 test_start = test_data['date'].min()
-forecast_test_period = forecast_combined[forecast_combined['ds'] >= test_start].copy()
+in_test_period = forecast_combined['ds'] >= test_start
+forecast_test_period = forecast_combined[in_test_period].copy()
+
+# Alert messages are formatted from Prophet's float64 output, so the float32
+# copy cannot move a printed value across a 0.1 rounding boundary
+forecast_text = pd.DataFrame({
+    'temp': forecast_temp['yhat'],
+    'humid': forecast_humid['yhat'],
+    'precip': forecast_precip['yhat'].clip(lower=0)
+})[in_test_period]
 
 print(f" Forecast period: {forecast_test_period['ds'].min()} to {forecast_test_period['ds'].max()}")
 print(f" Number of days: {len(forecast_test_period)}")
@@ -256,7 +293,9 @@ print(f" Number of days: {len(forecast_test_period)}")
 print("\n[12.2] Generating Alerts")
 print("-" * 80)
 
-alerts_df = generate_alerts(forecast_test_period, alert_thresholds)
+alerts_df = generate_alerts(forecast_test_period, alert_thresholds, forecast_text)
+
+disease_types = ['disease_risk_high', 'disease_risk_moderate']
 
 print(f" Total alerts generated: {len(alerts_df)}")
 print(f"\nAlert breakdown by type:")
@@ -265,9 +304,25 @@ print(alerts_df['type'].value_counts())
 print(f"\nAlert breakdown by severity:")
 print(alerts_df['severity'].value_counts())
 
-# Save alerts
-alerts_df.to_csv('generated_alerts.csv', index=False)
-print(f"\n Saved: generated_alerts.csv")
+# Save alerts. Parquet feeds the dashboard (typed, no parsing); the CSV is
+# the exported log. Unchanged alerts are not rewritten, so the file mtime
+# tells Section 14 whether the alert figures need redrawing
+alert_files = ['generated_alerts.parquet', 'generated_alerts.csv']
+if (all(os.path.exists(path) for path in alert_files) and
+        pd.read_parquet('generated_alerts.parquet').equals(alerts_df)):
+    print(f"\n Unchanged: {', '.join(alert_files)}")
+else:
+    alerts_df.to_parquet('generated_alerts.parquet', engine='pyarrow', compression='zstd', index=False)
+    alerts_df.to_csv('generated_alerts.csv', index=False)
+    print(f"\n Saved: {', '.join(alert_files)}")
+
+# The forecasts drawn in the overview figure are a figure input as well; keep
+# a copy next to the Prophet cache, rewritten only when the forecasts change
+forecast_path = os.path.join('.prophet_cache', 'forecast_test_period.parquet')
+os.makedirs('.prophet_cache', exist_ok=True)
+if not (os.path.exists(forecast_path) and
+        pd.read_parquet(forecast_path).equals(forecast_test_period)):
+    forecast_test_period.to_parquet(forecast_path, engine='pyarrow')
 
 # ============================================================================
 # SECTION 13: ALERT SYSTEM PERFORMANCE ANALYSIS
@@ -281,7 +336,7 @@ print("\n[13.1] Lead Time Analysis")
 print("-" * 80)
 print("Lead time: How many days in advance were alerts generated?")
 
-lead_time_stats = alerts_df.groupby('type')['lead_time_days'].agg(['mean', 'min', 'max', 'count'])
+lead_time_stats = alerts_df.groupby('type', observed=True)['lead_time_days'].agg(['mean', 'min', 'max', 'count'])
 print("\nLead Time Statistics by Alert Type:")
 print(lead_time_stats)
 
@@ -293,22 +348,23 @@ print("\n[13.3] Validation Against Actual Conditions")
 print("-" * 80)
 print("Comparing alerts to actual observed conditions in test set...")
 
-# Merge with actual test data
-test_conditions = test_data[['date', 'atmp_mean', 'relh_mean', 'pcpn_sum']].copy()
-test_conditions['actual_frost'] = test_conditions['atmp_mean'] < 0
-test_conditions['actual_heat'] = test_conditions['atmp_mean'] > 30
-test_conditions['actual_high_humid'] = test_conditions['relh_mean'] > 90
+# Flag actual events in the observed test data
+actual_temp = test_data['atmp_mean'].to_numpy()
+actual_humid = test_data['relh_mean'].to_numpy()
+actual_frost = actual_temp < 0
+actual_heat = actual_temp > 30
+actual_high_humid = actual_humid > 90
 
 # Count actual events
 print(f"\nActual events in test period:")
-print(f"  - Frost days: {test_conditions['actual_frost'].sum()}")
-print(f"  - Heat stress days: {test_conditions['actual_heat'].sum()}")
-print(f"  - High humidity days: {test_conditions['actual_high_humid'].sum()}")
+print(f"  - Frost days: {np.count_nonzero(actual_frost)}")
+print(f"  - Heat stress days: {np.count_nonzero(actual_heat)}")
+print(f"  - High humidity days: {np.count_nonzero(actual_high_humid)}")
 
 # Count predicted events
 frost_alerts = len(alerts_df[alerts_df['type'] == 'frost_warning'])
 heat_alerts = len(alerts_df[alerts_df['type'] == 'heat_stress'])
-disease_alerts = len(alerts_df[alerts_df['type'].str.contains('disease')])
+disease_alerts = int(alerts_df['type'].isin(disease_types).sum())
 
 print(f"\nAlerts generated:")
 print(f"  - Frost warnings: {frost_alerts}")
@@ -323,135 +379,170 @@ print("\n" + "="*80)
 print("SECTION 14: ALERT SYSTEM VISUALIZATIONS")
 print("="*80)
 
-# Plot 1: Forecast with alert markers
-fig, axes = plt.subplots(3, 1, figsize=(14, 12))
-
-# Temperature with frost and heat alerts
-axes[0].plot(forecast_test_period['ds'], forecast_test_period['temp'], 
-             label='Forecast Temperature', linewidth=2, color='steelblue')
-axes[0].fill_between(forecast_test_period['ds'], 
-                      forecast_test_period['temp_lower'],
-                      forecast_test_period['temp_upper'],
-                      alpha=0.2, color='steelblue', label='95% Confidence Interval')
-
-# Mark actual temperatures
-if len(test_data) > 0:
-    axes[0].plot(test_data['date'], test_data['atmp_mean'], 
-                 label='Actual Temperature', linewidth=2, color='black', alpha=0.7)
-
-# Mark frost alerts
-frost_alerts_df = alerts_df[alerts_df['type'] == 'frost_warning']
-if len(frost_alerts_df) > 0:
-    axes[0].scatter(frost_alerts_df['date'], frost_alerts_df['value'], 
-                    color='blue', s=100, marker='v', label='Frost Alert', zorder=5)
-
-# Mark heat alerts
-heat_alerts_df = alerts_df[alerts_df['type'] == 'heat_stress']
-if len(heat_alerts_df) > 0:
-    axes[0].scatter(heat_alerts_df['date'], heat_alerts_df['value'], 
-                    color='red', s=100, marker='^', label='Heat Alert', zorder=5)
-
-axes[0].axhline(y=0, color='blue', linestyle='--', alpha=0.5, label='Frost Threshold')
-axes[0].axhline(y=30, color='red', linestyle='--', alpha=0.5, label='Heat Threshold')
-axes[0].set_ylabel('Temperature (degC)')
-axes[0].set_title('Temperature Forecast with Frost & Heat Alerts', fontsize=12, fontweight='bold')
-axes[0].legend(loc='best', fontsize=8)
-axes[0].grid(True, alpha=0.3)
-
-# Humidity with disease risk alerts
-axes[1].plot(forecast_test_period['ds'], forecast_test_period['humid'], 
-             label='Forecast Humidity', linewidth=2, color='green')
-
-if len(test_data) > 0:
-    axes[1].plot(test_data['date'], test_data['relh_mean'], 
-                 label='Actual Humidity', linewidth=2, color='black', alpha=0.7)
-
-# Mark disease alerts
-disease_alerts_df = alerts_df[alerts_df['type'].str.contains('disease')]
-if len(disease_alerts_df) > 0:
-    high_disease = disease_alerts_df[disease_alerts_df['type'] == 'disease_risk_high']
-    mod_disease = disease_alerts_df[disease_alerts_df['type'] == 'disease_risk_moderate']
+def figure_is_stale(fig_path, *input_paths):
+    """
+    Check whether a figure is missing or older than any file it is drawn from
+    """
+    if not os.path.exists(fig_path):
+        return True
+    return os.path.getmtime(fig_path) < max(os.path.getmtime(p) for p in input_paths)
+
+def plot_alert_overview(forecast_test_period, test_data, alerts_df, disease_types, fig_path):
+    """
+    Plot 1: Forecast with alert markers
+    """
+    fig, axes = plt.subplots(3, 1, figsize=(14, 12), sharex=True)
+    
+    # Temperature with frost and heat alerts
+    axes[0].plot(forecast_test_period['ds'], forecast_test_period['temp'], 
+                 label='Forecast Temperature', linewidth=2, color='steelblue')
+    axes[0].fill_between(forecast_test_period['ds'], 
+                          forecast_test_period['temp_lower'],
+                          forecast_test_period['temp_upper'],
+                          alpha=0.2, color='steelblue', label='95% Confidence Interval')
+    
+    # Mark actual temperatures
+    if len(test_data) > 0:
+        axes[0].plot(test_data['date'], test_data['atmp_mean'], 
+                     label='Actual Temperature', linewidth=2, color='black', alpha=0.7)
+    
+    # Mark frost alerts
+    frost_alerts_df = alerts_df[alerts_df['type'] == 'frost_warning']
+    if len(frost_alerts_df) > 0:
+        axes[0].scatter(frost_alerts_df['date'], frost_alerts_df['value'], 
+                        color='blue', s=100, marker='v', label='Frost Alert', zorder=5)
+    
+    # Mark heat alerts
+    heat_alerts_df = alerts_df[alerts_df['type'] == 'heat_stress']
+    if len(heat_alerts_df) > 0:
+        axes[0].scatter(heat_alerts_df['date'], heat_alerts_df['value'], 
+                        color='red', s=100, marker='^', label='Heat Alert', zorder=5)
+    
+    axes[0].axhline(y=0, color='blue', linestyle='--', alpha=0.5, label='Frost Threshold')
+    axes[0].axhline(y=30, color='red', linestyle='--', alpha=0.5, label='Heat Threshold')
+    axes[0].set_ylabel('Temperature (degC)')
+    axes[0].set_title('Temperature Forecast with Frost & Heat Alerts', fontsize=12, fontweight='bold')
+    axes[0].legend(loc='best', fontsize=8)
+    axes[0].grid(True, alpha=0.3)
+    
+    # Humidity with disease risk alerts
+    axes[1].plot(forecast_test_period['ds'], forecast_test_period['humid'], 
+                 label='Forecast Humidity', linewidth=2, color='green')
+    
+    if len(test_data) > 0:
+        axes[1].plot(test_data['date'], test_data['relh_mean'], 
+                     label='Actual Humidity', linewidth=2, color='black', alpha=0.7)
+    
+    # Mark disease alerts
+    disease_alerts_df = alerts_df[alerts_df['type'].isin(disease_types)]
+    if len(disease_alerts_df) > 0:
+        high_disease = disease_alerts_df[disease_alerts_df['type'] == 'disease_risk_high']
+        mod_disease = disease_alerts_df[disease_alerts_df['type'] == 'disease_risk_moderate']
+        
+        if len(high_disease) > 0:
+            axes[1].scatter(high_disease['date'], high_disease['value'], 
+                            color='darkred', s=100, marker='X', label='High Disease Risk', zorder=5)
+        if len(mod_disease) > 0:
+            axes[1].scatter(mod_disease['date'], mod_disease['value'], 
+                            color='orange', s=80, marker='o', label='Moderate Disease Risk', zorder=5)
+    
+    axes[1].axhline(y=90, color='darkred', linestyle='--', alpha=0.5, label='High Risk Threshold')
+    axes[1].axhline(y=85, color='orange', linestyle='--', alpha=0.5, label='Moderate Risk Threshold')
+    axes[1].set_ylabel('Relative Humidity (%)')
+    axes[1].set_title('Humidity Forecast with Disease Risk Alerts', fontsize=12, fontweight='bold')
+    axes[1].legend(loc='best', fontsize=8)
+    axes[1].grid(True, alpha=0.3)
+    
+    # Precipitation
+    axes[2].bar(forecast_test_period['ds'], forecast_test_period['precip'], 
+                width=1, alpha=0.6, label='Forecast Precipitation', color='steelblue')
+    
+    if len(test_data) > 0:
+        axes[2].bar(test_data['date'], test_data['pcpn_sum'], 
+                    width=1, alpha=0.6, label='Actual Precipitation', color='navy')
+    
+    axes[2].axhline(y=25, color='red', linestyle='--', alpha=0.5, label='Heavy Rain Threshold')
+    axes[2].set_ylabel('Precipitation (mm)')
+    axes[2].set_xlabel('Date')
+    axes[2].set_title('Precipitation Forecast', fontsize=12, fontweight='bold')
+    axes[2].legend(loc='best', fontsize=8)
+    axes[2].grid(True, alpha=0.3)
+    
+    plt.tight_layout()
+    plt.savefig(fig_path, dpi=150, bbox_inches='tight')
+    print(f" Saved: {fig_path}")
+    plt.close()
+
+def plot_alert_timeline(alerts_df, alert_types, fig_path):
+    """
+    Plot 2: Alert timeline
+    """
+    fig, ax = plt.subplots(figsize=(14, 6))
+    
+    colors = {'frost_warning': 'blue', 'heat_stress': 'red', 
+              'disease_risk_high': 'darkred', 'disease_risk_moderate': 'orange',
+              'heavy_rain': 'purple'}
+    
+    for i, alert_type in enumerate(alert_types):
+        subset = alerts_df[alerts_df['type'] == alert_type]
+        ax.scatter(subset['date'], [i] * len(subset), 
+                   s=100, alpha=0.7, color=colors.get(alert_type, 'gray'),
+                   label=alert_type.replace('_', ' ').title())
+    
+    ax.set_yticks(range(len(alert_types)))
+    ax.set_yticklabels([at.replace('_', ' ').title() for at in alert_types])
+    ax.set_xlabel('Date')
+    ax.set_title('Alert Timeline - All Alerts Generated', fontsize=12, fontweight='bold')
+    ax.legend(loc='upper right')
+    ax.grid(True, alpha=0.3, axis='x')
+    
+    plt.tight_layout()
+    plt.savefig(fig_path, dpi=150, bbox_inches='tight')
+    print(f" Saved: {fig_path}")
+    plt.close()
+
+def plot_alert_statistics(alerts_df, fig_path):
+    """
+    Plot 3: Alert frequency by type
+    """
+    fig, axes = plt.subplots(1, 2, figsize=(14, 6))
+    
+    alert_counts = alerts_df['type'].value_counts()
+    axes[0].barh(range(len(alert_counts)), alert_counts.values, alpha=0.7)
+    axes[0].set_yticks(range(len(alert_counts)))
+    axes[0].set_yticklabels([at.replace('_', ' ').title() for at in alert_counts.index])
+    axes[0].set_xlabel('Number of Alerts')
+    axes[0].set_title('Alert Frequency by Type', fontsize=12, fontweight='bold')
+    axes[0].grid(True, alpha=0.3, axis='x')
+    
+    severity_counts = alerts_df['severity'].value_counts()
+    axes[1].pie(severity_counts.values, labels=severity_counts.index, autopct='%1.1f%%',
+                colors=['red', 'orange'], startangle=90)
+    axes[1].set_title('Alert Distribution by Severity', fontsize=12, fontweight='bold')
     
-    if len(high_disease) > 0:
-        axes[1].scatter(high_disease['date'], high_disease['value'], 
-                        color='darkred', s=100, marker='X', label='High Disease Risk', zorder=5)
-    if len(mod_disease) > 0:
-        axes[1].scatter(mod_disease['date'], mod_disease['value'], 
-                        color='orange', s=80, marker='o', label='Moderate Disease Risk', zorder=5)
-
-axes[1].axhline(y=90, color='darkred', linestyle='--', alpha=0.5, label='High Risk Threshold')
-axes[1].axhline(y=85, color='orange', linestyle='--', alpha=0.5, label='Moderate Risk Threshold')
-axes[1].set_ylabel('Relative Humidity (%)')
-axes[1].set_title('Humidity Forecast with Disease Risk Alerts', fontsize=12, fontweight='bold')
-axes[1].legend(loc='best', fontsize=8)
-axes[1].grid(True, alpha=0.3)
-
-# Precipitation
-axes[2].bar(forecast_test_period['ds'], forecast_test_period['precip'], 
-            width=1, alpha=0.6, label='Forecast Precipitation', color='steelblue')
-
-if len(test_data) > 0:
-    axes[2].bar(test_data['date'], test_data['pcpn_sum'], 
-                width=1, alpha=0.6, label='Actual Precipitation', color='navy')
-
-axes[2].axhline(y=25, color='red', linestyle='--', alpha=0.5, label='Heavy Rain Threshold')
-axes[2].set_ylabel('Precipitation (mm)')
-axes[2].set_xlabel('Date')
-axes[2].set_title('Precipitation Forecast', fontsize=12, fontweight='bold')
-axes[2].legend(loc='best', fontsize=8)
-axes[2].grid(True, alpha=0.3)
-
-plt.tight_layout()
-plt.savefig('figures/07_alert_system_overview.png', dpi=300, bbox_inches='tight')
-print(" Saved: figures/07_alert_system_overview.png")
-plt.close()
-
-# Plot 2: Alert timeline
-fig, ax = plt.subplots(figsize=(14, 6))
-
-alert_types = alerts_df['type'].unique()
-colors = {'frost_warning': 'blue', 'heat_stress': 'red', 
-          'disease_risk_high': 'darkred', 'disease_risk_moderate': 'orange',
-          'heavy_rain': 'purple'}
-
-for i, alert_type in enumerate(alert_types):
-    subset = alerts_df[alerts_df['type'] == alert_type]
-    ax.scatter(subset['date'], [i] * len(subset), 
-               s=100, alpha=0.7, color=colors.get(alert_type, 'gray'),
-               label=alert_type.replace('_', ' ').title())
-
-ax.set_yticks(range(len(alert_types)))
-ax.set_yticklabels([at.replace('_', ' ').title() for at in alert_types])
-ax.set_xlabel('Date')
-ax.set_title('Alert Timeline - All Alerts Generated', fontsize=12, fontweight='bold')
-ax.legend(loc='upper right')
-ax.grid(True, alpha=0.3, axis='x')
-
-plt.tight_layout()
-plt.savefig('figures/08_alert_timeline.png', dpi=300, bbox_inches='tight')
-print(" Saved: figures/08_alert_timeline.png")
-plt.close()
-
-# Plot 3: Alert frequency by type
-fig, axes = plt.subplots(1, 2, figsize=(14, 6))
-
-alert_counts = alerts_df['type'].value_counts()
-axes[0].barh(range(len(alert_counts)), alert_counts.values, alpha=0.7)
-axes[0].set_yticks(range(len(alert_counts)))
-axes[0].set_yticklabels([at.replace('_', ' ').title() for at in alert_counts.index])
-axes[0].set_xlabel('Number of Alerts')
-axes[0].set_title('Alert Frequency by Type', fontsize=12, fontweight='bold')
-axes[0].grid(True, alpha=0.3, axis='x')
-
-severity_counts = alerts_df['severity'].value_counts()
-axes[1].pie(severity_counts.values, labels=severity_counts.index, autopct='%1.1f%%',
-            colors=['red', 'orange'], startangle=90)
-axes[1].set_title('Alert Distribution by Severity', fontsize=12, fontweight='bold')
-
-plt.tight_layout()
-plt.savefig('figures/09_alert_statistics.png', dpi=300, bbox_inches='tight')
-print(" Saved: figures/09_alert_statistics.png")
-plt.close()
+    plt.tight_layout()
+    plt.savefig(fig_path, dpi=150, bbox_inches='tight')
+    print(f" Saved: {fig_path}")
+    plt.close()
+
+alert_types = alerts_df['type'].cat.categories
+
+# The figures depend only on the daily data, the alerts and the test-period
+# forecasts (both only rewritten when they change) and the plotting code in
+# this script, so skip up-to-date ones
+figure_inputs = ['daily_weather_aetna.parquet', 'generated_alerts.parquet', forecast_path, __file__]
+figure_jobs = [
+    ('figures/07_alert_system_overview.png', plot_alert_overview,
+     (forecast_test_period, test_data, alerts_df, disease_types)),
+    ('figures/08_alert_timeline.png', plot_alert_timeline, (alerts_df, alert_types)),
+    ('figures/09_alert_statistics.png', plot_alert_statistics, (alerts_df,))
+]
+
+for fig_path, plot_func, plot_args in figure_jobs:
+    if figure_is_stale(fig_path, *figure_inputs):
+        plot_func(*plot_args, fig_path)
+    else:
+        print(f" Up to date: {fig_path}")
 
 print("\n" + "="*80)
 print("PROJECT 1 COMPLETED: TIME-SERIES FORECASTING & ALERT SYSTEM")
@@ -464,8 +555,8 @@ print("    Train/Val/Test split (1727/366/239 days)")
 print("    Feature engineering (GDD, temperature range)")
 print("\n2. Models Developed:")
 print("    ARIMA(5,1,3) - MAE: 12.18degC")
-print("    Prophet - MAE: 3.56degC (BEST)")
-print("    Baseline (Persistence) - MAE: 12.09degC")
+print("    Prophet - MAE: 3.56degC (best multi-step model)")
+print("    Baseline (1-day Persistence) - MAE: 2.50degC")
 print("\n3. Alert System:")
 print(f"    {len(alerts_df)} alerts generated across {len(alert_types)} categories")
 print(f"    Average lead time: {alerts_df['lead_time_days'].mean():.1f} days")
@@ -476,7 +567,7 @@ print("    Forecast comparisons, residual analysis, alert timelines")
 print("\n5. Documentation:")
 print("    Complete methodology documented")
 print("    Model comparison results saved")
-print("    Alert log exported (CSV)")
+print("    Alert log exported (Parquet + CSV)")
 print("\n" + "="*80)
 print("Resume Alignment:  FULLY DEMONSTRATED")
 print("="*80)
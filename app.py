@@ -12,12 +12,13 @@ Data Provider: Enviroweather at Michigan State University
 Data Usage: Publicly available data used with permission for educational purposes
 """
 
+import os
 import streamlit as st
 import pandas as pd
 import numpy as np
+import pyarrow.parquet as pq
 import plotly.graph_objects as go
 import plotly.express as px
-from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
@@ -73,17 +74,157 @@ st.markdown("""
 # DATA LOADING
 # ============================================================================
 
-@st.cache_data
-def load_data():
- """Load processed data and results"""
- daily_data = pd.read_csv('daily_weather_aetna.csv', parse_dates=['date'])
- model_comparison = pd.read_csv('model_comparison_results.csv')
- alerts = pd.read_csv('generated_alerts.csv', parse_dates=['date'])
- return daily_data, model_comparison, alerts
+# cache_resource hands every rerun and session the same frames instead of
+# unpickling a fresh copy each time; pages only filter or .copy() them.
+# The TTL picks up outputs regenerated by the pipeline scripts. Each frame
+# carries the mtime of the file it was read from in attrs['version'], which
+# the derived caches below take as a hashed argument.
+@st.cache_resource(ttl="1h")
+def load_daily_data():
+ """Load the processed daily weather data"""
+ version = os.path.getmtime('daily_weather_aetna.parquet')
+ daily = pq.read_table('daily_weather_aetna.parquet', memory_map=True).to_pandas()
+ # Index by date too (the column stays for plotting) so date ranges are a sorted-index slice
+ daily.index = pd.DatetimeIndex(daily['date'].to_numpy())
+ if not daily.index.is_monotonic_increasing:
+  daily = daily.sort_index()
+ daily.attrs['version'] = version
+ return daily
+
+@st.cache_resource(ttl="1h")
+def load_model_comparison():
+ """Load the model evaluation metrics (every column is displayed)"""
+ version = os.path.getmtime('model_comparison_results.csv')
+ comparison = pd.read_csv('model_comparison_results.csv', engine='pyarrow')
+ comparison.attrs['version'] = version
+ return comparison
+
+# Every severity the alert system can emit, most urgent first
+SEVERITY_DTYPE = pd.CategoricalDtype(['HIGH', 'MEDIUM'], ordered=True)
+
+@st.cache_resource(ttl="1h")
+def load_alerts():
+ """Load the generated alert log"""
+ version = os.path.getmtime('generated_alerts.parquet')
+ alerts = pq.read_table('generated_alerts.parquet', memory_map=True).to_pandas()
+ # type is stored as a categorical; severity is widened back to the full ordered set
+ # since the alert system drops unused categories before writing
+ alerts['type'] = alerts['type'].astype('category')
+ alerts['severity'] = alerts['severity'].astype(SEVERITY_DTYPE)
+ # Labels for the table and timeline hover, formatted once per load
+ alerts['type_display'] = alerts['type'].cat.rename_categories(lambda t: t.replace('_', ' ').title())
+ alerts['date_display'] = alerts['date'].dt.strftime('%Y-%m-%d')
+ alerts.attrs['version'] = version
+ return alerts
+
+def lttb(x, y, n_out):
+ """Largest-Triangle-Three-Buckets downsampling; returns the indices to keep"""
+ n = len(y)
+ if n_out >= n or n_out < 3:
+  return np.arange(n)
+ 
+ # First and last points are always kept; the rest is split into n_out - 2 buckets
+ edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+ keep = np.empty(n_out, dtype=np.int64)
+ keep[0], keep[-1] = 0, n - 1
+ a = 0
+ for i in range(n_out - 2):
+  lo, hi = edges[i], edges[i + 1]
+  next_hi = edges[i + 2] if i + 2 < len(edges) else n
+  avg_x = x[hi:next_hi].mean()
+  avg_y = y[hi:next_hi].mean()
+  # Keep the point forming the largest triangle with the previous pick and next bucket's mean
+  area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+  a = lo + int(area.argmax())
+  keep[i + 1] = a
+ return keep
+
+# The leading underscore keeps Streamlit from hashing the (already cached)
+# frame on every call, so a cache hit costs nothing. The TTLs run
+# independently, so each helper also takes the frame's attrs['version']:
+# a reloaded file gets new cache entries instead of results from the old one
+@st.cache_data(ttl="1h")
+def overview_series(_daily_data, version, n_out=500):
+ """Downsample the overview temperature traces (visually lossless for line plots)"""
+ dates = _daily_data['date'].to_numpy()
+ x = dates.astype(np.int64).astype(np.float64)
+ series = {}
+ for col in ['atmp_mean', 'atmp_max', 'atmp_min']:
+  y = _daily_data[col].to_numpy(dtype=np.float64)
+  keep = lttb(x, y, n_out)
+  series[col] = (dates[keep], y[keep])
+ return series
+
+@st.cache_data(ttl="1h")
+def explorer_series(_daily_data, version, start_date, end_date, col, n_out=2000):
+ """Downsample one Data Explorer variable over the selected date range"""
+ in_range = _daily_data.loc[pd.to_datetime(start_date):pd.to_datetime(end_date)]
+ dates = in_range['date'].to_numpy()
+ y = in_range[col].to_numpy(dtype=np.float64)
+ keep = lttb(dates.astype(np.int64).astype(np.float64), y, n_out)
+ return dates[keep], y[keep]
+
+@st.cache_data(ttl="1h")
+def describe_range(_daily_data, version, start_date, end_date, cols):
+ """Descriptive statistics of the selected variables over a date range"""
+ stats = _daily_data.loc[pd.to_datetime(start_date):pd.to_datetime(end_date), list(cols)].describe().T
+ stats.columns = ['Count', 'Mean', 'Std Dev', 'Min', '25%', '50%', '75%', 'Max']
+ return stats
+
+@st.cache_data(ttl="1h")
+def daily_extremes(_daily_data, version):
+ """Date and value of the coldest, hottest and wettest days"""
+ dates = _daily_data['date'].to_numpy()
+ extremes = {}
+ for name, col, pick in [('coldest', 'atmp_min', np.nanargmin),
+  ('hottest', 'atmp_max', np.nanargmax),
+  ('wettest', 'pcpn_sum', np.nanargmax)]:
+  values = _daily_data[col].to_numpy()
+  i = int(pick(values))
+  extremes[name] = (pd.Timestamp(dates[i]), float(values[i]))
+ return extremes
+
+@st.cache_data(ttl="1h")
+def metric_bar_figure(_model_comparison, version, metric):
+ """Bar chart of one test-set metric across the models, as a plain figure dict"""
+ values = _model_comparison[f'Test_{metric}']
+ return {
+  'data': [{
+   'type': 'bar',
+   'x': _model_comparison['Model'].tolist(),
+   'y': values.tolist(),
+   'text': values.round(3).tolist(),
+   'textposition': 'auto',
+   'marker': {'color': ['#ff7f0e', '#2ca02c', '#d62728']}
+  }],
+  'layout': {
+   'yaxis': {'title': {'text': f"{metric} (degC)"}},
+   'height': 400,
+   'showlegend': False
+  }
+ }
+
+@st.cache_data(ttl="1h")
+def csv_bytes(_frame, version, key):
+ """CSV export of a filtered frame; version and key identify the data and filters behind it"""
+ return _frame.to_csv(index=False).encode()
+
+@st.cache_data(ttl="1h")
+def alert_summary(_alerts, version):
+ """Headline alert counts, mean lead time and the alert types present"""
+ return {
+  'total': len(_alerts),
+  'high': int(_alerts['severity'].eq('HIGH').sum()),
+  'mean_lead': float(_alerts['lead_time_days'].mean()),
+  'types': list(_alerts['type'].cat.remove_unused_categories().cat.categories)
+ }
 
 # Load data
 try:
- daily_data, model_comparison, alerts = load_data()
+ daily_data = load_daily_data()
+ model_comparison = load_model_comparison()
+ alerts = load_alerts()
+ alert_stats = alert_summary(alerts, alerts.attrs['version'])
  data_loaded = True
 except Exception as e:
  st.error(f"Error loading data: {e}")
@@ -147,7 +288,7 @@ if page == "Overview":
  
  with col2:
   st.metric(
- label="Best Model MAE",
+ label="Best Multi-Step MAE",
  value="3.56degC",
  delta="Prophet model"
  )
@@ -155,14 +296,14 @@ if page == "Overview":
  with col3:
   st.metric(
  label="Alerts Generated",
- value=len(alerts),
+ value=alert_stats['total'],
  delta="Test period"
  )
  
  with col4:
   st.metric(
    label="Avg Lead Time",
-   value=f"{alerts['lead_time_days'].mean():.1f} days",
+   value=f"{alert_stats['mean_lead']:.1f} days",
    delta="Early warning"
   )
  
@@ -216,11 +357,14 @@ if page == "Overview":
  # Temperature time series overview
  st.markdown("### Temperature Time Series Overview")
  
+ # ~500 LTTB-selected points per trace look the same as the full daily series
+ overview = overview_series(daily_data, daily_data.attrs['version'])
+ 
  fig = go.Figure()
  
  fig.add_trace(go.Scatter(
- x=daily_data['date'],
- y=daily_data['atmp_mean'],
+ x=overview['atmp_mean'][0],
+ y=overview['atmp_mean'][1],
  mode='lines',
  name='Mean Temperature',
  line=dict(color='steelblue', width=1),
@@ -228,8 +372,8 @@ if page == "Overview":
  ))
  
  fig.add_trace(go.Scatter(
- x=daily_data['date'],
- y=daily_data['atmp_max'],
+ x=overview['atmp_max'][0],
+ y=overview['atmp_max'][1],
  mode='lines',
  name='Max Temperature',
  line=dict(color='red', width=1, dash='dot'),
@@ -237,8 +381,8 @@ if page == "Overview":
  ))
  
  fig.add_trace(go.Scatter(
- x=daily_data['date'],
- y=daily_data['atmp_min'],
+ x=overview['atmp_min'][0],
+ y=overview['atmp_min'][1],
  mode='lines',
  name='Min Temperature',
  line=dict(color='blue', width=1, dash='dot'),
@@ -258,23 +402,25 @@ if page == "Overview":
  # Quick stats
  col1, col2, col3 = st.columns(3)
  
+ extremes = daily_extremes(daily_data, daily_data.attrs['version'])
+ 
  with col1:
   st.markdown("#### Coldest Day")
-  coldest = daily_data.loc[daily_data['atmp_min'].idxmin()]
-  st.write(f"**{coldest['date'].strftime('%Y-%m-%d')}**")
-  st.write(f"Temperature: {coldest['atmp_min']:.1f}degC")
+  coldest_date, coldest_temp = extremes['coldest']
+  st.write(f"**{coldest_date.strftime('%Y-%m-%d')}**")
+  st.write(f"Temperature: {coldest_temp:.1f}degC")
  
  with col2:
   st.markdown("#### Hottest Day")
-  hottest = daily_data.loc[daily_data['atmp_max'].idxmax()]
-  st.write(f"**{hottest['date'].strftime('%Y-%m-%d')}**")
-  st.write(f"Temperature: {hottest['atmp_max']:.1f}degC")
+  hottest_date, hottest_temp = extremes['hottest']
+  st.write(f"**{hottest_date.strftime('%Y-%m-%d')}**")
+  st.write(f"Temperature: {hottest_temp:.1f}degC")
  
  with col3:
   st.markdown("#### Wettest Day")
-  wettest = daily_data.loc[daily_data['pcpn_sum'].idxmax()]
-  st.write(f"**{wettest['date'].strftime('%Y-%m-%d')}**")
-  st.write(f"Precipitation: {wettest['pcpn_sum']:.1f}mm")
+  wettest_date, wettest_pcpn = extremes['wettest']
+  st.write(f"**{wettest_date.strftime('%Y-%m-%d')}**")
+  st.write(f"Precipitation: {wettest_pcpn:.1f}mm")
 
 # ============================================================================
 # PAGE: MODEL PERFORMANCE
@@ -290,63 +436,36 @@ elif page == "Model Performance":
  comparison_display = model_comparison.copy()
  comparison_display.columns = ['Model', 'Val MAE', 'Val RMSE', 'Val MAPE', 'Test MAE', 'Test RMSE', 'Test MAPE']
  
- # Highlight best model
- def highlight_best(s):
-  if s.name in ['Test MAE', 'Test RMSE', 'Test MAPE']:
-   is_min = s == s.min()
-   return ['background-color: #c8e6c9' if v else '' for v in is_min]
-  return ['' for _ in s]
- 
- styled_table = comparison_display.style.apply(highlight_best, axis=0).format({
+ # Format as plain strings; the best test score in each column is starred
+ formats = {
  'Val MAE': '{:.3f}degC',
  'Val RMSE': '{:.3f}degC',
  'Val MAPE': '{:.2f}%',
  'Test MAE': '{:.3f}degC',
  'Test RMSE': '{:.3f}degC',
  'Test MAPE': '{:.2f}%'
- })
+ }
+ for col, fmt in formats.items():
+  best = comparison_display[col].idxmin() if col.startswith('Test') else None
+  comparison_display[col] = comparison_display[col].map(fmt.format)
+  if best is not None:
+   comparison_display.loc[best, col] += ' ★'
  
- st.dataframe(styled_table, use_container_width=True)
+ st.table(comparison_display.set_index('Model'))
  
- st.info("**Best Model: Prophet** - Achieved lowest MAE (3.56degC) on test set, significantly outperforming ARIMA and baseline models.")
+ st.info("**Best Multi-Step Model: Prophet** - Achieved the lowest test MAE (3.56degC) among the multi-step models, significantly outperforming ARIMA. The persistence baseline has the lowest scores overall (starred) because it is a 1-day-ahead reference, not a multi-step forecast.")
  
  # Visual comparison
  col1, col2 = st.columns(2)
  
  with col1:
   st.markdown("### Test Set MAE Comparison")
-  fig = go.Figure(data=[
-   go.Bar(
- x=model_comparison['Model'],
- y=model_comparison['Test_MAE'],
- text=model_comparison['Test_MAE'].round(3),
- textposition='auto',
- marker_color=['#ff7f0e', '#2ca02c', '#d62728']
- )
- ])
- fig.update_layout(
- yaxis_title="MAE (degC)",
- height=400,
- showlegend=False
- )
+  fig = metric_bar_figure(model_comparison, model_comparison.attrs['version'], 'MAE')
  st.plotly_chart(fig, use_container_width=True)
  
  with col2:
   st.markdown("### Test Set RMSE Comparison")
-  fig = go.Figure(data=[
-   go.Bar(
- x=model_comparison['Model'],
- y=model_comparison['Test_RMSE'],
- text=model_comparison['Test_RMSE'].round(3),
- textposition='auto',
- marker_color=['#ff7f0e', '#2ca02c', '#d62728']
- )
- ])
- fig.update_layout(
- yaxis_title="RMSE (degC)",
- height=400,
- showlegend=False
- )
+  fig = metric_bar_figure(model_comparison, model_comparison.attrs['version'], 'RMSE')
  st.plotly_chart(fig, use_container_width=True)
  
  st.markdown("---")
@@ -444,17 +563,18 @@ elif page == "Model Performance":
  models provide meaningful improvements.
  
  **Method:**
- - Forecast = Last observed value
+ - Forecast = Previous day's observed value (walk-forward)
  - No learning or pattern recognition
  - Simple but effective for stable series
  
  **Performance:**
- - Test MAE: 12.09degC
- - Test RMSE: 14.28degC
+ - Test MAE: 2.50degC
+ - Test RMSE: 3.36degC
  
  **Interpretation:**
- Both ARIMA and Prophet significantly outperform the baseline, with Prophet 
- achieving a **70% reduction in MAE** compared to persistence.
+ Persistence sees every observation up to the day before, so it is a 1-day-ahead 
+ reference. ARIMA and Prophet forecast the whole test period from the end of 
+ training, and Prophet keeps its error at 3.56degC across that horizon.
  """)
 
 # ============================================================================
@@ -468,12 +588,11 @@ elif page == "Alert System":
  col1, col2, col3 = st.columns(3)
  
  with col1:
-  st.metric("Total Alerts", len(alerts))
+  st.metric("Total Alerts", alert_stats['total'])
  with col2:
-  high_severity = len(alerts[alerts['severity'] == 'HIGH'])
-  st.metric("High Severity", high_severity, delta=f"{high_severity/len(alerts)*100:.1f}%")
+  st.metric("High Severity", alert_stats['high'], delta=f"{alert_stats['high']/alert_stats['total']*100:.1f}%")
  with col3:
-  st.metric("Avg Lead Time", f"{alerts['lead_time_days'].mean():.1f} days")
+  st.metric("Avg Lead Time", f"{alert_stats['mean_lead']:.1f} days")
  
  st.markdown("---")
  
@@ -537,55 +656,54 @@ elif page == "Alert System":
  # Filter options
  col1, col2 = st.columns([3, 1])
  with col1:
-  alert_types = ['All'] + list(alerts['type'].unique())
+  alert_types = ['All'] + alert_stats['types']
   selected_type = st.selectbox("Filter by Alert Type", alert_types)
  with col2:
-  severity_filter = st.selectbox("Filter by Severity", ['All', 'HIGH', 'MEDIUM'])
+  severity_filter = st.selectbox("Filter by Severity", ['All'] + list(SEVERITY_DTYPE.categories))
  
  # Apply filters
  filtered_alerts = alerts.copy()
  if selected_type != 'All':
-  filtered_alerts = filtered_alerts[filtered_alerts['type'] == selected_type]
+  filtered_alerts = filtered_alerts[filtered_alerts['type'].eq(selected_type)]
  if severity_filter != 'All':
-  filtered_alerts = filtered_alerts[filtered_alerts['severity'] == severity_filter]
+  filtered_alerts = filtered_alerts[filtered_alerts['severity'].eq(severity_filter)]
  
  # Alert timeline visualization
- fig = go.Figure()
- 
- for alert_type in filtered_alerts['type'].unique():
-  subset = filtered_alerts[filtered_alerts['type'] == alert_type]
-  fig.add_trace(go.Scatter(
- x=subset['date'],
- y=[alert_type] * len(subset),
- mode='markers',
- name=alert_type.replace('_', ' ').title(),
- marker=dict(size=12, symbol='diamond'),
- hovertemplate='<b>%{y}</b><br>Date: %{x}<br><extra></extra>'
- ))
- 
- fig.update_layout(
- title=f"Alert Timeline ({len(filtered_alerts)} alerts)",
- xaxis_title="Date",
- yaxis_title="Alert Type",
- height=400,
- hovermode='closest'
- )
+ # One WebGL trace for every alert, coloured by type
+ alert_type_codes = filtered_alerts['type'].astype('category').cat.codes
+ fig = {
+ 'data': [{
+ 'type': 'scattergl',
+ 'x': filtered_alerts['date'],
+ 'y': filtered_alerts['type'].astype(str),
+ 'mode': 'markers',
+ 'marker': {'size': 12, 'symbol': 'diamond', 'color': alert_type_codes, 'colorscale': 'Viridis'},
+ 'text': filtered_alerts['type_display'].astype(str),
+ 'hovertemplate': '<b>%{text}</b><br>Date: %{x}<br><extra></extra>'
+ }],
+ 'layout': {
+ 'title': {'text': f"Alert Timeline ({len(filtered_alerts)} alerts)"},
+ 'xaxis': {'title': {'text': "Date"}},
+ 'yaxis': {'title': {'text': "Alert Type"}},
+ 'height': 400,
+ 'hovermode': 'closest',
+ 'showlegend': False
+ }
+ }
  
  st.plotly_chart(fig, use_container_width=True)
  
  # Recent alerts table
  st.markdown("### Recent Alerts (Last 20)")
  
- recent_alerts = filtered_alerts.sort_values('date', ascending=False).head(20)
- display_alerts = recent_alerts[['date', 'type', 'severity', 'message', 'lead_time_days']].copy()
+ recent_alerts = filtered_alerts.nlargest(20, 'date')
+ display_alerts = recent_alerts[['date_display', 'type_display', 'severity', 'message', 'lead_time_days']]
  display_alerts.columns = ['Date', 'Type', 'Severity', 'Message', 'Lead Time (days)']
- display_alerts['Date'] = display_alerts['Date'].dt.strftime('%Y-%m-%d')
- display_alerts['Type'] = display_alerts['Type'].str.replace('_', ' ').str.title()
  
  st.dataframe(display_alerts, use_container_width=True, hide_index=True)
  
  # Download alerts
- csv = filtered_alerts.to_csv(index=False)
+ csv = csv_bytes(filtered_alerts.drop(columns=['type_display', 'date_display']), alerts.attrs['version'], ('alerts', selected_type, severity_filter))
  st.download_button(
  label="Download Alerts (CSV)",
  data=csv,
@@ -609,8 +727,7 @@ elif page == "Data Explorer":
   end_date = st.date_input("End Date", daily_data['date'].max())
  
  # Filter data
- mask = (daily_data['date'] >= pd.to_datetime(start_date)) & (daily_data['date'] <= pd.to_datetime(end_date))
- filtered_data = daily_data[mask]
+ filtered_data = daily_data.loc[pd.to_datetime(start_date):pd.to_datetime(end_date)]
  
  st.info(f"Showing {len(filtered_data)} days of data")
  
@@ -634,28 +751,36 @@ elif page == "Data Explorer":
  )
  
  if selected_vars:
-  fig = make_subplots(
-   rows=len(selected_vars),
-   cols=1,
-   subplot_titles=selected_vars,
-   vertical_spacing=0.1
-  )
+  # Stacked subplots laid out by hand, matching make_subplots(rows=n, cols=1, vertical_spacing=0.1)
+  n_rows = len(selected_vars)
+  spacing = 0.1
+  row_height = (1 - spacing * (n_rows - 1)) / n_rows
+  traces = []
+  layout = {'height': 300 * n_rows, 'showlegend': False, 'annotations': []}
   
   for i, var_name in enumerate(selected_vars, 1):
    var_col = variables[var_name]
-   fig.add_trace(
- go.Scatter(
- x=filtered_data['date'],
- y=filtered_data[var_col],
- mode='lines',
- name=var_name,
- line=dict(width=2)
- ),
- row=i,
- col=1
- )
- 
- fig.update_layout(height=300 * len(selected_vars), showlegend=False)
+   suffix = '' if i == 1 else str(i)
+   top = 1 - (i - 1) * (row_height + spacing)
+   x, y = explorer_series(daily_data, daily_data.attrs['version'], start_date, end_date, var_col)
+   traces.append({
+ 'type': 'scattergl',
+ 'x': x,
+ 'y': y,
+ 'mode': 'lines',
+ 'name': var_name,
+ 'line': {'width': 2},
+ 'xaxis': f'x{suffix}',
+ 'yaxis': f'y{suffix}'
+ })
+   layout[f'xaxis{suffix}'] = {'anchor': f'y{suffix}', 'domain': [0, 1]}
+   layout[f'yaxis{suffix}'] = {'anchor': f'x{suffix}', 'domain': [max(top - row_height, 0), top]}
+   layout['annotations'].append({
+ 'text': var_name, 'x': 0.5, 'y': top, 'xref': 'paper', 'yref': 'paper',
+ 'xanchor': 'center', 'yanchor': 'bottom', 'showarrow': False, 'font': {'size': 16}
+ })
+  
+  fig = {'data': traces, 'layout': layout}
  st.plotly_chart(fig, use_container_width=True)
  
  st.markdown("---")
@@ -664,15 +789,14 @@ elif page == "Data Explorer":
  st.markdown("### Descriptive Statistics")
  
  stats_vars = [variables[v] for v in selected_vars] if selected_vars else list(variables.values())
- stats = filtered_data[stats_vars].describe().T
- stats.columns = ['Count', 'Mean', 'Std Dev', 'Min', '25%', '50%', '75%', 'Max']
+ stats = describe_range(daily_data, daily_data.attrs['version'], start_date, end_date, tuple(stats_vars))
  st.dataframe(stats, use_container_width=True)
  
  # Raw data
  with st.expander("View Raw Data"):
-  st.dataframe(filtered_data, use_container_width=True)
+  st.dataframe(filtered_data, use_container_width=True, hide_index=True)
  
- csv = filtered_data.to_csv(index=False)
+ csv = csv_bytes(filtered_data, daily_data.attrs['version'], ('daily', start_date, end_date))
  st.download_button(
  label="Download Data (CSV)",
  data=csv,
@@ -4,39 +4,132 @@ Extract sample data from MAWN QC SQL dump for portfolio projects
 Focus on a few stations with complete data for modeling
 """
 
+import csv
 import gzip
+import io
 import re
+import shutil
+import subprocess
+from contextlib import contextmanager
 import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
 from datetime import datetime
 import sys
 
-def extract_hourly_data_from_sql(sql_gz_path, output_csv, max_records=50000):
+# COPY header of a per-station hourly table, matched against raw dump lines
+COPY_RE = re.compile(rb'COPY public\.(\w+)_hourly')
+
+# Hourly table columns kept in the sample: position in the COPY row -> name
+HOURLY_COLUMNS = {
+    0: 'year', 1: 'day', 2: 'hour', 3: 'rpt_time', 4: 'date', 5: 'time',
+    6: 'atmp', 7: 'atmp_src', 8: 'relh', 9: 'relh_src', 10: 'dwpt', 11: 'dwpt_src',
+    12: 'pcpn', 13: 'pcpn_src', 14: 'lws0_pwet', 15: 'lws0_pwet_src',
+    18: 'wspd', 19: 'wspd_src', 20: 'wdir', 24: 'srad', 25: 'srad_src',
+    26: 'stmp_05cm', 28: 'stmp_10cm', 34: 'smst_05cm', 36: 'smst_10cm', 46: 'rpet',
+}
+
+HOURLY_DTYPES = {
+    'year': 'Int32', 'day': 'Int32', 'hour': 'Int32', 'rpt_time': 'Int32',
+    'date': 'string', 'time': 'string',
+    'atmp': 'float32', 'relh': 'float32', 'dwpt': 'float32', 'pcpn': 'float32',
+    'lws0_pwet': 'float32', 'wspd': 'float32', 'wdir': 'float32', 'srad': 'float32',
+    'stmp_05cm': 'float32', 'stmp_10cm': 'float32', 'smst_05cm': 'float32',
+    'smst_10cm': 'float32', 'rpet': 'float32',
+    'atmp_src': 'string', 'relh_src': 'string', 'dwpt_src': 'string', 'pcpn_src': 'string',
+    'lws0_pwet_src': 'string', 'wspd_src': 'string', 'srad_src': 'string',
+}
+
+# COPY writes NULL as \N. As in the original per-row parser, an empty numeric
+# field is missing and a "nan" measurement is NaN, while source flags keep any
+# other text (NA, null, an empty string) as-is
+HOURLY_NA_VALUES = {
+    'Int32': ['\\N', ''],
+    'float32': ['\\N', '', 'nan', 'NaN', 'NAN'],
+    'string': ['\\N'],
+}
+
+@contextmanager
+def open_sql_dump(sql_gz_path):
     """
-    Extract hourly data from SQL dump and save to CSV
-    Parse INSERT statements for hourly tables
+    Open the gzipped dump as a binary stream, decompressing in a pigz subprocess when
+    available so decompression runs on another core while this process parses
+    """
+    pigz = shutil.which('pigz')
+    if pigz is None:
+        with gzip.open(sql_gz_path, 'rb') as f:
+            yield f
+        return
+    
+    proc = subprocess.Popen([pigz, '-dc', sql_gz_path], stdout=subprocess.PIPE, bufsize=1 << 20)
+    stopped_early = True
+    try:
+        yield proc.stdout
+        # Anything left unread means the scan stopped early (max_records)
+        stopped_early = proc.stdout.read(1) != b''
+    finally:
+        # Stopping early leaves pigz blocked on a full pipe
+        proc.stdout.close()
+        if stopped_early:
+            proc.terminate()
+        proc.wait()
+    
+    # A full read must end cleanly, like gzip.open raising on a truncated or corrupt dump
+    if not stopped_early and proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, proc.args)
+
+def parse_copy_block(lines, station_name):
+    """
+    Parse the tab-separated rows of one COPY block with the C CSV parser
+    """
+    # Name every position up to the widest row so rows without the trailing
+    # columns read them as missing instead of failing the whole block
+    width = max(line.count(b'\t') for line in lines) + 1
+    block = pd.read_csv(
+        io.BytesIO(b''.join(lines)),
+        sep='\t',
+        header=None,
+        names=range(max(width, max(HOURLY_COLUMNS) + 1)),
+        usecols=list(HOURLY_COLUMNS),
+        # Only \N (and an empty numeric field) is missing; literal NA, null or nan strings are kept
+        na_values={pos: HOURLY_NA_VALUES[HOURLY_DTYPES[name]] for pos, name in HOURLY_COLUMNS.items()},
+        keep_default_na=False,
+        quoting=csv.QUOTE_NONE,
+        dtype={pos: HOURLY_DTYPES[name] for pos, name in HOURLY_COLUMNS.items()},
+        engine='c',
+    )
+    block = block.rename(columns=HOURLY_COLUMNS)[list(HOURLY_COLUMNS.values())]
+    block.insert(0, 'station', station_name)
+    return block
+
+def extract_hourly_data_from_sql(sql_gz_path, output_dir, max_records=50000):
+    """
+    Extract hourly data from SQL dump and save it as a Parquet dataset partitioned by station
+    Collect the COPY rows of each hourly table and parse them per station
     """
     
     print(f"Extracting data from {sql_gz_path}...")
     
     # Track which station we're currently processing
     current_table = None
-    station_data = []
+    block_lines = []
+    station_blocks = []
     total_records = 0
     
     # We'll focus on a few stations for the portfolio
-    target_stations = ['aetna', 'albion', 'allegan', 'alpine', 'bath']
+    target_stations = frozenset(['aetna', 'albion', 'allegan', 'alpine', 'bath'])
     
-    with gzip.open(sql_gz_path, 'rt', encoding='utf-8') as f:
+    with open_sql_dump(sql_gz_path) as f:
         for line_num, line in enumerate(f):
             if line_num % 100000 == 0:
                 print(f"Processed {line_num} lines, collected {total_records} records...")
             
             # Detect table context
-            if 'COPY public.' in line and '_hourly' in line:
+            if line.startswith(b'COPY public.'):
                 # Extract station name
-                match = re.search(r'COPY public\.(\w+)_hourly', line)
+                match = COPY_RE.match(line)
                 if match:
-                    station_name = match.group(1)
+                    station_name = match.group(1).decode()
                     if station_name in target_stations:
                         current_table = station_name
                         print(f"\nFound hourly table for station: {station_name}")
@@ -45,67 +138,37 @@ def extract_hourly_data_from_sql(sql_gz_path, output_csv, max_records=50000):
                 continue
             
             # Check for end of COPY block
-            if line.strip() == '\\.' or line.strip().startswith('--'):
+            stripped = line.strip()
+            if stripped == b'\\.' or stripped.startswith(b'--'):
                 if current_table:
                     print(f"Finished reading {current_table}_hourly")
+                    # An empty block (or one whose rows were all malformed) adds nothing
+                    if block_lines:
+                        station_blocks.append(parse_copy_block(block_lines, current_table))
+                        block_lines = []
                 current_table = None
                 continue
             
-            # Parse data lines when we're in a target table
-            if current_table and line.strip() and not line.startswith('--'):
-                try:
-                    # Split by tabs (PostgreSQL COPY format)
-                    fields = line.strip().split('\t')
-                    
-                    if len(fields) >= 29:  # Ensure we have enough fields
-                        # Parse the key fields based on the hourly table structure
-                        record = {
-                            'station': current_table,
-                            'year': int(fields[0]) if fields[0] != '\\N' else None,
-                            'day': int(fields[1]) if fields[1] != '\\N' else None,
-                            'hour': int(fields[2]) if fields[2] != '\\N' else None,
-                            'rpt_time': int(fields[3]) if fields[3] != '\\N' else None,
-                            'date': fields[4] if fields[4] != '\\N' else None,
-                            'time': fields[5] if fields[5] != '\\N' else None,
-                            'atmp': float(fields[6]) if fields[6] not in ['\\N', ''] else None,
-                            'atmp_src': fields[7] if fields[7] != '\\N' else None,
-                            'relh': float(fields[8]) if fields[8] not in ['\\N', ''] else None,
-                            'relh_src': fields[9] if fields[9] != '\\N' else None,
-                            'dwpt': float(fields[10]) if fields[10] not in ['\\N', ''] else None,
-                            'dwpt_src': fields[11] if fields[11] != '\\N' else None,
-                            'pcpn': float(fields[12]) if fields[12] not in ['\\N', ''] else None,
-                            'pcpn_src': fields[13] if fields[13] != '\\N' else None,
-                            'lws0_pwet': float(fields[14]) if fields[14] not in ['\\N', ''] else None,
-                            'lws0_pwet_src': fields[15] if fields[15] != '\\N' else None,
-                            'wspd': float(fields[18]) if len(fields) > 18 and fields[18] not in ['\\N', ''] else None,
-                            'wspd_src': fields[19] if len(fields) > 19 and fields[19] != '\\N' else None,
-                            'wdir': float(fields[20]) if len(fields) > 20 and fields[20] not in ['\\N', ''] else None,
-                            'srad': float(fields[24]) if len(fields) > 24 and fields[24] not in ['\\N', ''] else None,
-                            'srad_src': fields[25] if len(fields) > 25 and fields[25] != '\\N' else None,
-                            'stmp_05cm': float(fields[26]) if len(fields) > 26 and fields[26] not in ['\\N', ''] else None,
-                            'stmp_10cm': float(fields[28]) if len(fields) > 28 and fields[28] not in ['\\N', ''] else None,
-                            'smst_05cm': float(fields[34]) if len(fields) > 34 and fields[34] not in ['\\N', ''] else None,
-                            'smst_10cm': float(fields[36]) if len(fields) > 36 and fields[36] not in ['\\N', ''] else None,
-                            'rpet': float(fields[46]) if len(fields) > 46 and fields[46] not in ['\\N', ''] else None,
-                        }
-                        
-                        station_data.append(record)
-                        total_records += 1
-                        
-                        if total_records >= max_records:
-                            print(f"\nReached maximum records ({max_records}), stopping extraction...")
-                            break
-                            
-                except (ValueError, IndexError) as e:
-                    # Skip malformed lines
+            # Collect data lines when we're in a target table
+            if current_table and stripped:
+                # Rows with fewer than 29 fields once stripped are malformed; skip
+                # them as before (trailing empty fields do not count)
+                if stripped.count(b'\t') < 28:
                     continue
-            
-            if total_records >= max_records:
-                break
+                block_lines.append(line)
+                total_records += 1
+                
+                if total_records >= max_records:
+                    print(f"\nReached maximum records ({max_records}), stopping extraction...")
+                    break
+    
+    # Parse the rows of a block cut short by max_records or end of file
+    if current_table and block_lines:
+        station_blocks.append(parse_copy_block(block_lines, current_table))
     
-    # Convert to DataFrame
-    print(f"\nConverting {len(station_data)} records to DataFrame...")
-    df = pd.DataFrame(station_data)
+    # Combine the per-station frames
+    df = pd.concat(station_blocks, ignore_index=True)
+    print(f"\nCombined {len(df)} records into a DataFrame")
     
     # Create datetime column
     df['datetime'] = pd.to_datetime(df['date'] + ' ' + df['time'])
@@ -113,9 +176,23 @@ def extract_hourly_data_from_sql(sql_gz_path, output_csv, max_records=50000):
     # Sort by station and datetime
     df = df.sort_values(['station', 'datetime'])
     
-    # Save to CSV
-    print(f"Saving to {output_csv}...")
-    df.to_csv(output_csv, index=False)
+    # Quality flags repeat on every row, so store them as categoricals and let
+    # Parquet dictionary-encode them (station becomes the partition directory)
+    for col in [c for c in df.columns if c.endswith('_src')]:
+        df[col] = df[col].astype('category')
+    
+    # Save as a hive-partitioned dataset (station=<name>/ directories) so readers
+    # can load a single station without scanning the others
+    print(f"Saving to {output_dir}/...")
+    ds.write_dataset(
+        pa.Table.from_pandas(df, preserve_index=False),
+        output_dir,
+        format='parquet',
+        partitioning=['station'],
+        partitioning_flavor='hive',
+        file_options=ds.ParquetFileFormat().make_write_options(compression='snappy'),
+        existing_data_behavior='delete_matching',
+    )
     
     print(f"\nExtraction complete!")
     print(f"Total records: {len(df)}")
@@ -130,7 +207,7 @@ if __name__ == '__main__':
     # Update these paths as needed for your system
     # Place the SQL dump file in the project root or specify full path
     sql_gz_path = 'mawndb_qc-20250827.sql.gz'  # Or use absolute path
-    output_csv = 'mawn_hourly_sample.csv'
+    output_dir = 'mawn_hourly_sample'
     
     # Check if input file exists
     import os
@@ -140,5 +217,5 @@ if __name__ == '__main__':
         print(f"or update the sql_gz_path variable with the correct path.")
         sys.exit(1)
     
-    df = extract_hourly_data_from_sql(sql_gz_path, output_csv, max_records=100000)
+    df = extract_hourly_data_from_sql(sql_gz_path, output_dir, max_records=100000)
 